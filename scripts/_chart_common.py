@@ -0,0 +1,98 @@
+"""
+Helpers shared by chart.py and chart_compact.py.
+
+Loads tests/results.json, parses benchmark case names, normalizes rates to
+5-character patterns, and picks the baseline / latest entries per device.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import re
+from pathlib import Path
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # optional, stdlib json also accepts bytes
+    _loads = json.loads
+
+RESULTS_PATH = Path(__file__).resolve().parent.parent / "tests" / "results.json"
+
+OLD_IMPL = "ton-community/vanity-contract"
+NEW_IMPL = "ton-org/vanity"
+
+_LEN_RE = re.compile(r"(\d+)")
+
+# Scale factor from an N-character match to the 5-character reference, keyed by
+# (length, case_insensitive). A friendly address has 48 characters.
+_NORM_FACTOR = {
+    (length, ci): (2 / 64 if ci else 1 / 64) ** (5 - length)
+    for length in range(1, 49)
+    for ci in (False, True)
+}
+
+
+def load_results() -> dict:
+    """Load benchmark results from JSON file."""
+    if not RESULTS_PATH.exists():
+        raise FileNotFoundError(f"Results file not found: {RESULTS_PATH}")
+    return _loads(RESULTS_PATH.read_bytes())
+
+
+def normalize_rate(rate: float, length: int, case_insensitive: bool) -> float:
+    """Normalize rate to equivalent 5-character match probability."""
+    factor = _NORM_FACTOR.get((length, case_insensitive))
+    if factor is None:  # outside the table's 1..48 range
+        factor = (2 / 64 if case_insensitive else 1 / 64) ** (5 - length)
+    return rate * factor
+
+
+def parse_case_name(name: str) -> tuple[str, int, bool] | None:
+    """Parse case name like 'start 4 ci' into (position, length, case_insensitive)."""
+    return parse_lower_case_name(name.lower())
+
+
+@functools.lru_cache(maxsize=512)
+def parse_lower_case_name(name: str) -> tuple[str, int, bool] | None:
+    """parse_case_name for an already lowercased name."""
+    length_match = _LEN_RE.search(name)
+    if not length_match:
+        return None
+    length = int(length_match.group(1))
+
+    if "start" in name:
+        position = "start"
+    elif "end" in name:
+        position = "end"
+    else:
+        return None
+
+    case_insensitive = "ci" in name
+    return position, length, case_insensitive
+
+
+def split_entries(entries: list[dict]) -> tuple[dict | None, dict | None]:
+    """
+    Find the old implementation baseline and the latest (by timestamp)
+    non-baseline entry in a single pass over the device entries.
+    """
+    old_entry: dict | None = None
+    latest_entry: dict | None = None
+    latest_ts: float | None = None
+
+    for entry in entries:
+        if entry.get("title") == OLD_IMPL:
+            if old_entry is None:
+                old_entry = entry
+            continue
+        ts = entry.get("timestamp")
+        if not isinstance(ts, (int, float)):
+            continue
+        if latest_ts is None or ts > latest_ts:
+            latest_ts = ts
+            latest_entry = entry
+
+    return old_entry, latest_entry
@@ -8,27 +8,29 @@ showing speedup factors normalized to 5-character patterns.
 
 from __future__ import annotations
 
-import json
-import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
-import matplotlib
-
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib import font_manager
+from matplotlib import font_manager, rcParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
 from matplotlib.transforms import Bbox
 
+from _chart_common import (
+    NEW_IMPL,
+    OLD_IMPL,
+    load_results,
+    normalize_rate,
+    parse_case_name,
+    split_entries,
+)
+
 # === Configuration ===
 
-RESULTS_PATH = Path(__file__).resolve().parent.parent / "tests" / "results.json"
 OUTPUT_PATH = Path(__file__).resolve().parent.parent / "tests" / "benchmarks.png"
 
-OLD_IMPL = "ton-community/vanity-contract"
-NEW_IMPL = "ton-org/vanity"
-
 # Categories in display order (top to bottom)
 CATEGORIES = [
     ("start 5 ci", "--start"),
@@ -36,6 +38,7 @@ CATEGORIES = [
     ("end 5 ci", "--end"),
     ("end 5 cs", "--case-sensitive --end"),
 ]
+CATEGORY_KEYS = tuple(key for key, _ in CATEGORIES)
 
 # Device display order and names
 DEVICE_ORDER = ["NVIDIA GeForce RTX 4090", "Apple M2 Max"]
@@ -59,59 +62,23 @@ COLORS = {
 # === Data Structures ===
 
 
-@dataclass
+@dataclass(slots=True)
 class BenchmarkResult:
     device: str
     category: str
     old_rate: float
     new_rate: float
+    speedup: float = field(init=False)
 
-    @property
-    def speedup(self) -> float:
-        if self.old_rate <= 0:
-            return float("nan")
-        return self.new_rate / self.old_rate
+    def __post_init__(self):
+        self.speedup = (
+            self.new_rate / self.old_rate if self.old_rate > 0 else float("nan")
+        )
 
 
 # === Data Loading ===
 
 
-def load_results() -> dict:
-    """Load benchmark results from JSON file."""
-    if not RESULTS_PATH.exists():
-        raise FileNotFoundError(f"Results file not found: {RESULTS_PATH}")
-    return json.loads(RESULTS_PATH.read_text())
-
-
-def normalize_rate(rate: float, length: int, case_insensitive: bool) -> float:
-    """Normalize rate to equivalent 5-character match probability."""
-    char_prob = 2 / 64 if case_insensitive else 1 / 64
-    current_prob = char_prob**length
-    target_prob = char_prob**5
-    return rate * (target_prob / current_prob)
-
-
-def parse_case_name(name: str) -> tuple[str, int, bool] | None:
-    """Parse case name like 'start 4 ci' into (position, length, case_insensitive)."""
-    name = name.lower()
-
-    length_match = re.search(r"(\d+)", name)
-    if not length_match:
-        return None
-    length = int(length_match.group(1))
-
-    if "start" in name:
-        position = "start"
-    elif "end" in name:
-        position = "end"
-    else:
-        return None
-
-    case_insensitive = "ci" in name
-
-    return position, length, case_insensitive
-
-
 def _extract_rates_from_entry(entry: dict) -> dict[str, float]:
     """Extract normalized rates for all categories from a single JSON entry."""
     rates: dict[str, float] = {}
@@ -136,69 +103,46 @@ def _extract_rates_from_entry(entry: dict) -> dict[str, float]:
     return rates
 
 
-def extract_rates(entries: list[dict], title: str) -> dict[str, float]:
-    """Extract normalized rates for each category from benchmark entries."""
-    for entry in entries:
-        if entry.get("title") != title:
-            continue
-        return _extract_rates_from_entry(entry)
-
-    return {}
-
-
-def extract_latest_new_rates(entries: list[dict]) -> dict[str, float]:
-    """
-    Extract normalized rates for the "new" implementation as
-    the latest entry (by timestamp) per device, excluding the
-    old implementation baseline.
-    """
-    latest_entry: dict | None = None
-    latest_ts: float | None = None
-
-    for entry in entries:
-        if entry.get("title") == OLD_IMPL:
-            continue
-        ts = entry.get("timestamp")
-        if not isinstance(ts, (int, float)):
-            continue
-        if latest_ts is None or ts > latest_ts:
-            latest_ts = ts
-            latest_entry = entry
-
-    if latest_entry is None:
-        return {}
-
-    return _extract_rates_from_entry(latest_entry)
-
-
 def build_benchmark_data(raw_data: dict) -> list[BenchmarkResult]:
     """Build list of benchmark results from raw JSON data."""
     results = []
 
     for device, entries in raw_data.items():
-        old_rates = extract_rates(entries, OLD_IMPL)
         # For the "new" implementation, always take the latest
         # entry per device (by timestamp), so charts reflect the
         # most recent benchmark run.
-        new_rates = extract_latest_new_rates(entries)
+        old_entry, new_entry = split_entries(entries)
+        if old_entry is None or new_entry is None:
+            continue
 
+        old_rates = _extract_rates_from_entry(old_entry)
+        new_rates = _extract_rates_from_entry(new_entry)
         if not old_rates or not new_rates:
             continue
 
-        for cat_key, _ in CATEGORIES:
-            if cat_key in old_rates and cat_key in new_rates:
-                results.append(
-                    BenchmarkResult(
-                        device=device,
-                        category=cat_key,
-                        old_rate=old_rates[cat_key],
-                        new_rate=new_rates[cat_key],
-                    )
-                )
+        results.extend(
+            BenchmarkResult(
+                device=device,
+                category=cat_key,
+                old_rate=old_rates[cat_key],
+                new_rate=new_rates[cat_key],
+            )
+            for cat_key in CATEGORY_KEYS
+            if cat_key in old_rates and cat_key in new_rates
+        )
 
     return results
 
 
+def compute_speedups(results: list[BenchmarkResult]) -> np.ndarray:
+    """Speedup for each result, aligned with ``results`` (NaN if undefined)."""
+    return np.fromiter(
+        (r.speedup for r in results),
+        dtype=np.float64,
+        count=len(results),
+    )
+
+
 # === Plotting ===
 
 
@@ -207,7 +151,7 @@ def setup_style():
     # Fail fast if IBM Plex Sans is unavailable
     font_manager.findfont("IBM Plex Sans", fallback_to_default=False)
 
-    plt.rcParams.update(
+    rcParams.update(
         {
             "font.family": "IBM Plex Sans",
             "font.size": 11,
@@ -226,7 +170,7 @@ def setup_style():
     )
 
 
-def create_chart(results: list[BenchmarkResult]) -> plt.Figure:
+def create_chart(results: list[BenchmarkResult], speedups: np.ndarray) -> Figure:
     """Create the benchmark comparison chart."""
 
     # Get devices in specified order, filtering to those with data
@@ -242,7 +186,9 @@ def create_chart(results: list[BenchmarkResult]) -> plt.Figure:
     n_categories = len(CATEGORIES)
 
     # Create figure
-    fig, ax = plt.subplots(figsize=(11, 5.5), dpi=200)
+    fig = Figure(figsize=(11, 5.5), dpi=200)
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
 
     # Bar layout
     bar_height = 0.38
@@ -250,16 +196,16 @@ def create_chart(results: list[BenchmarkResult]) -> plt.Figure:
     group_height = n_devices * bar_height + (n_devices - 1) * bar_gap
     group_gap = 0.6
 
-    # Build lookup for results
+    # Build lookup from (category, device) to the result index
     result_lookup = {}
-    for r in results:
-        result_lookup[(r.category, r.device)] = r
+    for i, r in enumerate(results):
+        result_lookup[(r.category, r.device)] = i
 
     # Find max speedup for x-axis scaling
-    speedups = [r.speedup for r in results if np.isfinite(r.speedup) and r.speedup > 0]
-    if not speedups:
+    valid_speedups = speedups[np.isfinite(speedups) & (speedups > 0)]
+    if valid_speedups.size == 0:
         raise ValueError("No valid speedup values found")
-    max_speedup = max(speedups)
+    max_speedup = float(valid_speedups.max())
 
     # Keep a small, data-driven cushion so large new results don't leave huge empty space
     # while still guaranteeing labels stay inside the axes.
@@ -270,6 +216,11 @@ def create_chart(results: list[BenchmarkResult]) -> plt.Figure:
     y_positions = {}
     current_y = 0
 
+    # Bars are collected here and drawn with a single barh call below
+    bar_ys: list[float] = []
+    bar_speedups: list[float] = []
+    bar_colors: list[str] = []
+
     for cat_idx, (cat_key, cat_label) in enumerate(reversed(CATEGORIES)):
         group_bottom = current_y
 
@@ -278,38 +229,17 @@ def create_chart(results: list[BenchmarkResult]) -> plt.Figure:
             y = current_y + (n_devices - 1 - dev_idx) * (bar_height + bar_gap)
             y_positions[(cat_key, device)] = y
 
-            result = result_lookup.get((cat_key, device))
-            if not result:
+            result_idx = result_lookup.get((cat_key, device))
+            if result_idx is None:
                 continue
 
-            speedup = result.speedup
+            speedup = float(speedups[result_idx])
             if not np.isfinite(speedup) or speedup <= 0:
                 continue
 
-            color = DEVICE_COLORS.get(device, "#888888")
-
-            ax.barh(
-                y + bar_height / 2,
-                speedup - 1,
-                left=1,
-                height=bar_height,
-                color=color,
-                alpha=0.92,
-                zorder=3,
-            )
-
-            # Speedup label
-            ax.text(
-                speedup * (1 + LABEL_PAD),
-                y + bar_height / 2,
-                f"×{speedup:,.0f}",
-                va="center",
-                ha="left",
-                fontsize=9,
-                fontweight="600",
-                color=COLORS["text"],
-                zorder=4,
-            )
+            bar_ys.append(y + bar_height / 2)
+            bar_speedups.append(speedup)
+            bar_colors.append(DEVICE_COLORS.get(device, "#888888"))
 
         # Category label (centered on group)
         group_center = group_bottom + group_height / 2
@@ -327,6 +257,34 @@ def create_chart(results: list[BenchmarkResult]) -> plt.Figure:
 
         current_y += group_height + group_gap
 
+    bar_speedup_arr = np.asarray(bar_speedups)
+    ax.barh(
+        np.asarray(bar_ys),
+        bar_speedup_arr - 1,
+        left=1,
+        height=bar_height,
+        color=bar_colors,
+        alpha=0.92,
+        zorder=3,
+    )
+
+    # Speedup labels
+    label_xs = bar_speedup_arr * (1 + LABEL_PAD)
+    labels = [f"×{s:,.0f}" for s in bar_speedups]
+    text = ax.text
+    for label_x, label_y, label in zip(label_xs, bar_ys, labels):
+        text(
+            label_x,
+            label_y,
+            label,
+            va="center",
+            ha="left",
+            fontsize=9,
+            fontweight="600",
+            color=COLORS["text"],
+            zorder=4,
+        )
+
     # Separator lines between groups
     current_y = 0
     for cat_idx in range(n_categories - 1):
@@ -358,14 +316,14 @@ def create_chart(results: list[BenchmarkResult]) -> plt.Figure:
 
     # Legend - bottom right of axes
     handles = [
-        plt.Rectangle((0, 0), 1, 1, color=DEVICE_COLORS.get(d, "#888"), alpha=0.92)
+        Rectangle((0, 0), 1, 1, color=DEVICE_COLORS.get(d, "#888"), alpha=0.92)
         for d in devices
     ]
     labels = [DEVICE_NAMES.get(d, d) for d in devices]
 
     # Lock subplot geometry before positioning legend/title so we can derive true axis bounds
     # Pull the right edge in a bit so long labels don't run into the legend.
-    plt.subplots_adjust(top=0.84, bottom=0.04, left=0.26, right=0.78)
+    fig.subplots_adjust(top=0.84, bottom=0.04, left=0.26, right=0.78)
 
     # Legend inset from the figure's bottom-right corner by a fixed pixel cushion
     pad_px = 12
@@ -388,8 +346,9 @@ def create_chart(results: list[BenchmarkResult]) -> plt.Figure:
         borderaxespad=0.3,
     )
 
-    # Draw once to compute bounding boxes for centering
-    fig.canvas.draw()
+    # Lay out without rasterizing to compute bounding boxes for centering;
+    # savefig performs the only Agg render.
+    fig.draw_without_rendering()
     renderer = fig.canvas.get_renderer()
 
     bboxes = [
@@ -432,11 +391,10 @@ def main():
     if not results:
         raise ValueError("No benchmark data found")
 
-    fig = create_chart(results)
+    fig = create_chart(results, compute_speedups(results))
     fig.savefig(OUTPUT_PATH, dpi=200, bbox_inches="tight", facecolor=COLORS["bg"])
 
     print(f"Chart saved to {OUTPUT_PATH}")
-    plt.close(fig)
 
 
 if __name__ == "__main__":
@@ -8,29 +8,29 @@ of ton-org/vanity vs ton-community/vanity-contract.
 
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
+import math
+from dataclasses import dataclass, field
 from pathlib import Path
 
-import matplotlib
-
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib import font_manager
-from PIL import Image
+from matplotlib import font_manager, rcParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from _chart_common import (
+    load_results,
+    normalize_rate,
+    parse_lower_case_name,
+    split_entries,
+)
 
 # === Configuration ===
 
-RESULTS_PATH = Path(__file__).resolve().parent.parent / "tests" / "results.json"
 OUTPUT_PATH = (
     Path(__file__).resolve().parent.parent / "tests" / "benchmarks_compact.png"
 )
 LOGO_PATH = Path(__file__).resolve().parent / "ton-studio.png"
 
-OLD_IMPL = "ton-community/vanity-contract"
-NEW_IMPL = "ton-org/vanity"
-
 # Simplified categories for compact view
 COMPACT_CATEGORIES = [
     ("prefix", "Prefix"),
@@ -57,112 +57,39 @@ COLORS = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class CompactResult:
     device: str
     category: str  # "prefix" or "suffix"
     old_rate: float  # Normalized old implementation rate
     new_rate: float  # Normalized new implementation rate
+    speedup: float = field(init=False)
 
-    @property
-    def speedup(self) -> float:
-        if self.old_rate <= 0:
-            return float("nan")
-        return self.new_rate / self.old_rate
-
-
-def load_results() -> dict:
-    if not RESULTS_PATH.exists():
-        raise FileNotFoundError(f"Results file not found: {RESULTS_PATH}")
-    return json.loads(RESULTS_PATH.read_text())
-
-
-def parse_case_name(name: str) -> tuple[str, int, bool] | None:
-    """Parse case name like 'start 4 ci' into (position, length, case_insensitive)."""
-    import re
-
-    name = name.lower()
-    length_match = re.search(r"(\d+)", name)
-    if not length_match:
-        return None
-    length = int(length_match.group(1))
-
-    if "start" in name:
-        position = "start"
-    elif "end" in name:
-        position = "end"
-    else:
-        return None
-
-    case_insensitive = "ci" in name
-    return position, length, case_insensitive
-
-
-def normalize_rate(rate: float, length: int, case_insensitive: bool) -> float:
-    """Normalize rate to equivalent 5-character match probability."""
-    char_prob = 2 / 64 if case_insensitive else 1 / 64
-    current_prob = char_prob**length
-    target_prob = char_prob**5
-    return rate * (target_prob / current_prob)
+    def __post_init__(self):
+        self.speedup = (
+            self.new_rate / self.old_rate if self.old_rate > 0 else float("nan")
+        )
 
 
-def extract_rates(entries: list[dict], title: str) -> dict[str, list[float]]:
+def _extract_rates_from_entry(entry: dict | None) -> dict[str, list[float]]:
     """Extract normalized rates grouped by prefix/suffix (case-insensitive only)."""
     rates: dict[str, list[float]] = {"prefix": [], "suffix": []}
+    if entry is None:
+        return rates
 
-    for entry in entries:
-        if entry.get("title") != title:
-            continue
-        for case in entry.get("cases", []):
-            name = case.get("name", "")
-            rate = case.get("rate")
-            if not isinstance(rate, (int, float)):
-                continue
-            parsed = parse_case_name(name)
-            if not parsed:
-                continue
-            position, length, case_insensitive = parsed
-            # Only use case-insensitive results
-            if not case_insensitive:
-                continue
-            normalized = normalize_rate(rate, length, case_insensitive)
-            category = "prefix" if position == "start" else "suffix"
-            rates[category].append(normalized)
-
-    return rates
-
-
-def extract_latest_new_rates(entries: list[dict]) -> dict[str, list[float]]:
-    """Extract rates for the latest non-baseline entry (case-insensitive only)."""
-    latest_entry = None
-    latest_ts = None
-
-    for entry in entries:
-        if entry.get("title") == OLD_IMPL:
-            continue
-        ts = entry.get("timestamp")
-        if not isinstance(ts, (int, float)):
-            continue
-        if latest_ts is None or ts > latest_ts:
-            latest_ts = ts
-            latest_entry = entry
-
-    if latest_entry is None:
-        return {"prefix": [], "suffix": []}
-
-    rates: dict[str, list[float]] = {"prefix": [], "suffix": []}
-    for case in latest_entry.get("cases", []):
+    for case in entry.get("cases", []):
         name = case.get("name", "")
         rate = case.get("rate")
         if not isinstance(rate, (int, float)):
             continue
-        parsed = parse_case_name(name)
+        # Only use case-insensitive results; check before parsing
+        lower = name.lower()
+        if "ci" not in lower:
+            continue
+        parsed = parse_lower_case_name(lower)
         if not parsed:
             continue
         position, length, case_insensitive = parsed
-        # Only use case-insensitive results
-        if not case_insensitive:
-            continue
         normalized = normalize_rate(rate, length, case_insensitive)
         category = "prefix" if position == "start" else "suffix"
         rates[category].append(normalized)
@@ -170,13 +97,21 @@ def extract_latest_new_rates(entries: list[dict]) -> dict[str, list[float]]:
     return rates
 
 
+def _geomean(xs: list[float]) -> float:
+    """Geometric mean of a short list of rates (NaN if any rate is non-positive)."""
+    if any(x <= 0 for x in xs):
+        return float("nan")
+    return math.exp(math.fsum(math.log(x) for x in xs) / len(xs))
+
+
 def build_compact_data(raw_data: dict) -> list[CompactResult]:
     """Build compact results with average rates per category."""
     results = []
 
     for device, entries in raw_data.items():
-        old_rates = extract_rates(entries, OLD_IMPL)
-        new_rates = extract_latest_new_rates(entries)
+        old_entry, new_entry = split_entries(entries)
+        old_rates = _extract_rates_from_entry(old_entry)
+        new_rates = _extract_rates_from_entry(new_entry)
 
         for cat_key in ["prefix", "suffix"]:
             old_list = old_rates.get(cat_key, [])
@@ -186,8 +121,8 @@ def build_compact_data(raw_data: dict) -> list[CompactResult]:
                 continue
 
             # Use geometric mean for averaging rates
-            old_avg = np.exp(np.mean(np.log(old_list)))
-            new_avg = np.exp(np.mean(np.log(new_list)))
+            old_avg = _geomean(old_list)
+            new_avg = _geomean(new_list)
 
             if old_avg > 0:
                 results.append(
@@ -205,7 +140,7 @@ def build_compact_data(raw_data: dict) -> list[CompactResult]:
 def setup_style():
     """Configure matplotlib style."""
     font_manager.findfont("IBM Plex Sans", fallback_to_default=False)
-    plt.rcParams.update(
+    rcParams.update(
         {
             "font.family": "IBM Plex Sans",
             "font.size": 12,
@@ -217,27 +152,40 @@ def setup_style():
 
 
 def load_logo_inverted() -> np.ndarray | None:
-    """Load the logo and invert it to black."""
+    """Load the logo and invert it to black, caching the result next to the PNG."""
     if not LOGO_PATH.exists():
         return None
 
-    img = Image.open(LOGO_PATH).convert("RGBA")
-    data = np.array(img)
+    cache = LOGO_PATH.with_suffix(".inv.npy")
+    if cache.exists() and cache.stat().st_mtime >= LOGO_PATH.stat().st_mtime:
+        return np.load(cache)
+
+    from PIL import Image
+
+    data = np.asarray(Image.open(LOGO_PATH).convert("RGBA"))
 
     # Invert: white (255) -> black (0), preserve alpha
     # The logo is white on transparent, so we invert RGB channels
-    rgb = data[:, :, :3]
-    alpha = data[:, :, 3:]
+    inverted = np.empty_like(data)
+    np.subtract(255, data[:, :, :3], out=inverted[:, :, :3])
+    inverted[:, :, 3:] = data[:, :, 3:]
+
+    try:
+        np.save(cache, inverted)
+    except OSError:
+        pass  # read-only checkout; just skip the cache
+    return inverted
 
-    # Invert RGB (255 - value)
-    inverted_rgb = 255 - rgb
 
-    # Combine back
-    inverted = np.concatenate([inverted_rgb, alpha], axis=2)
-    return inverted
+def _power_scale(y):
+    """Power scale that compresses tall bars while keeping old bars visible.
+
+    Applied to the data up front so the axis itself stays linear.
+    """
+    return np.power(y, 0.35)
 
 
-def create_compact_chart(results: list[CompactResult]) -> plt.Figure:
+def create_compact_chart(results: list[CompactResult]) -> Figure:
     """Create a compact, social-media-friendly chart."""
 
     # Group results by device
@@ -245,7 +193,8 @@ def create_compact_chart(results: list[CompactResult]) -> plt.Figure:
     devices = [d for d in DEVICE_ORDER if d in available_devices]
 
     # Create figure - square-ish for social media
-    fig = plt.figure(figsize=(8, 6.5), dpi=200)
+    fig = Figure(figsize=(8, 6.5), dpi=200)
+    FigureCanvasAgg(fig)
 
     # Main content area - use log scale for better visualization
     ax = fig.add_axes([0.08, 0.18, 0.84, 0.58])
@@ -279,7 +228,14 @@ def create_compact_chart(results: list[CompactResult]) -> plt.Figure:
     # Find max rate for scaling (use actual rates, not speedup)
     max_rate = max(r.new_rate for r in results)
 
-    # Plot bars
+    # Collect bar geometry so old and new bars are each drawn with one call
+    old_xs: list[float] = []
+    old_heights: list[float] = []
+    new_xs: list[float] = []
+    new_heights: list[float] = []
+    new_colors: list[str] = []
+    labels: list[str] = []
+
     for cat_idx, (cat_key, cat_label) in enumerate(COMPACT_CATEGORIES):
         for dev_idx, device in enumerate(devices):
             result = result_lookup.get((cat_key, device))
@@ -287,47 +243,48 @@ def create_compact_chart(results: list[CompactResult]) -> plt.Figure:
                 continue
 
             old_pos, new_pos = positions[cat_idx][dev_idx]
-            color = DEVICE_COLORS.get(device, "#888888")
-
-            # Draw old (baseline) bar - gray, using actual old rate
-            ax.bar(
-                old_pos + bar_width / 2,
-                result.old_rate,
-                width=bar_width,
-                color=COLORS["old_bar"],
-                alpha=0.9,
-                zorder=2,
-            )
-
-            # Draw new bar - colored, using actual new rate
-            ax.bar(
-                new_pos + bar_width / 2,
-                result.new_rate,
-                width=bar_width,
-                color=color,
-                alpha=0.92,
-                zorder=3,
-            )
-
-            # Speedup label on top of new bar
-            label_y = result.new_rate * 1.12
-            ax.text(
-                new_pos + bar_width / 2,
-                label_y,
-                f"{result.speedup:,.0f}x",
-                ha="center",
-                va="bottom",
-                fontsize=14,
-                fontweight="700",
-                color=COLORS["text"],
-            )
-
-    # Use power scale to compress tall bars while keeping old bars small
-    ax.set_yscale(
-        "function",
-        functions=(lambda x: np.power(x, 0.35), lambda x: np.power(x, 1 / 0.35)),
+            old_xs.append(old_pos + bar_width / 2)
+            old_heights.append(result.old_rate)
+            new_xs.append(new_pos + bar_width / 2)
+            new_heights.append(result.new_rate)
+            new_colors.append(DEVICE_COLORS.get(device, "#888888"))
+            labels.append(f"{result.speedup:,.0f}x")
+
+    # Old (baseline) bars - gray, using actual old rates
+    ax.bar(
+        np.asarray(old_xs),
+        _power_scale(np.asarray(old_heights)),
+        width=bar_width,
+        color=COLORS["old_bar"],
+        alpha=0.9,
+        zorder=2,
+    )
+
+    # New bars - colored, using actual new rates
+    ax.bar(
+        np.asarray(new_xs),
+        _power_scale(np.asarray(new_heights)),
+        width=bar_width,
+        color=new_colors,
+        alpha=0.92,
+        zorder=3,
     )
-    ax.set_ylim(0, max_rate * 1.3)
+
+    # Speedup labels on top of new bars
+    text = ax.text
+    for label_x, new_rate, label in zip(new_xs, new_heights, labels):
+        text(
+            label_x,
+            _power_scale(new_rate * 1.12),
+            label,
+            ha="center",
+            va="bottom",
+            fontsize=14,
+            fontweight="700",
+            color=COLORS["text"],
+        )
+
+    ax.set_ylim(0, _power_scale(max_rate * 1.3))
     ax.set_xlim(-0.2, x - group_gap + 0.2)
 
     # X-axis labels (category names) - positioned below the chart
@@ -421,7 +378,6 @@ def main():
     fig.savefig(OUTPUT_PATH, dpi=200, bbox_inches="tight", facecolor=COLORS["bg"])
 
     print(f"Compact chart saved to {OUTPUT_PATH}")
-    plt.close(fig)
 
 
 if __name__ == "__main__":
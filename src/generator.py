@@ -6,7 +6,8 @@ Goals for this rewrite:
   `--non-bounceable`, `--testnet`, `--case-sensitive`, `--only-one`).
 - Make the host code "smart" and the kernel "dumb": all mapping of base64 patterns to
   byte-level masks happens here; the kernel only enforces masks and computes hashes.
-- Remove warm‑up / autotune loops; pick deterministic per‑device parameters instead.
+- Remove warm‑up / autotune loops; pick deterministic per‑device parameters instead,
+  unless `--tune` has measured and cached better ones for the device.
 - Only touch kernel logic where it depends on the new host assumptions (first hash byte
   rewrite + CRC check ordering).
 
@@ -22,12 +23,17 @@ import base64
 import hashlib
 import json
 import os
+import re
 import struct
 import sys
+import tempfile
 import time
 import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from threading import Lock, Thread
+from queue import Empty, Queue
+from threading import Event, Lock, Thread
 from typing import List, Optional, Sequence, Tuple
 
 import numpy as np
@@ -38,7 +44,7 @@ import pyopencl as cl
 # -----------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(slots=True)
 class CliConfig:
     owner: str
     start: Optional[str]
@@ -49,16 +55,18 @@ class CliConfig:
     case_sensitive: bool
     only_one: bool
     device_ids: Optional[List[int]] = None
+    all_devices: bool = False
+    tune: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class AddressParams:
     flags_byte: int
     wc_byte: int
     prefix_bits: List[int]  # 16 bits: flags + workchain (big-endian inside each byte)
 
 
-@dataclass
+@dataclass(slots=True)
 class KernelConfig:
     flags_hi: int
     flags_lo: int
@@ -93,14 +101,14 @@ class KernelConfig:
     ci_var_alt1: List[int]
 
 
-@dataclass
+@dataclass(slots=True)
 class DeviceParams:
     global_threads: int
     local_size: Optional[int]
     iterations: int
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchStats:
     speed_raw: float = 0.0
     speed_eff: float = 0.0
@@ -110,7 +118,7 @@ class SearchStats:
     iterations: int = 0
     local: Optional[int] = None
     variants: int = 0
-    updated: float = 0.0
+    updated: float = 0.0  # time.perf_counter() at publish
 
 
 # -----------------------------------------------------------------------------
@@ -121,6 +129,24 @@ PRINT_INTERVAL = 1.0  # seconds between status lines
 RES_SLOTS = 1024
 RES_SLOT_WORDS = 4
 RES_WORDS = RES_SLOTS * RES_SLOT_WORDS
+RES_HEAD_WORDS = 4  # hit counter (word 0) + padding ahead of the result slots
+STATE_WORDS = RES_HEAD_WORDS + RES_WORDS
+LOCAL_SIZE_TARGET = 256  # work-group size before rounding to the SIMD width
+LAUNCHES_PER_BATCH = 4  # kernel launches queued per result readback
+WRITE_BATCH_MAX = 256  # addresses.jsonl lines per write + flush
+TUNE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "vanity-generator")
+TUNE_LOCAL_SIZES = (32, 64, 128, 256)
+TUNE_ITER_SCALES = (0.25, 0.5, 1.0, 2.0)  # relative to pick_device_params()
+TUNE_GLOBAL_SCALES = (0.5, 1.0, 2.0, 4.0)
+TUNE_TRIALS = 3  # timed launches per candidate
+TUNE_MIN_GAIN = 1.03  # speedup a candidate needs to beat the current best
+
+# Status line formatting
+_RATE_UNITS = ("", "k", "M", "B", "T")  # per power of 1000
+_ANSI_GREEN = "\x1b[32m"
+_ANSI_WHITE = "\x1b[37m"
+_ANSI_DIM_CYAN = "\x1b[2m\x1b[36m"
+_ANSI_RESET = "\x1b[0m"
 
 # Address layout constants (bytes and bits)
 TOTAL_BYTES = 36
@@ -132,6 +158,18 @@ HASH_BIT_END = HASH_BIT_START + 256  # exclusive
 CONST1 = 1065632427291681  # 50 bits
 CONST2 = 457587318777827214152676959512820176586892797206855680  # 179 bits
 
+# SHA-256 initial hash values
+SHA256_IV = (
+    0x6A09E667,
+    0xBB67AE85,
+    0x3C6EF372,
+    0xA54FF53A,
+    0x510E527F,
+    0x9B05688C,
+    0x1F83D9AB,
+    0x5BE0CD19,
+)
+
 # SHA-256 round constants
 K_SHA256 = [
     0x428A2F98,
@@ -211,34 +249,30 @@ def die(msg: str):
     sys.exit(1)
 
 
-def int_to_bits(x: int, n: int) -> List[int]:
-    """Return n high-to-low bits of integer x (big-endian bit order)."""
-    return [(x >> (n - 1 - i)) & 1 for i in range(n)]
+def append_bits(acc: int, nbits: int, x: int, n: int) -> Tuple[int, int]:
+    """Append the n low bits of x to a big-endian bit accumulator of nbits bits."""
+    return (acc << n) | (x & ((1 << n) - 1)), nbits + n
 
 
 def bits_from_byte(b: int) -> List[int]:
     return [(b >> (7 - i)) & 1 for i in range(8)]
 
 
+_B64URL_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+_B64URL_VALUE = {ch: v for v, ch in enumerate(_B64URL_ALPHABET)}
+_B64URL_BITS = tuple(tuple((v >> (5 - j)) & 1 for j in range(6)) for v in range(64))
+
+
 def base64url_value(ch: str) -> int:
-    o = ord(ch)
-    if 65 <= o <= 90:  # A-Z
-        return o - 65
-    if 97 <= o <= 122:  # a-z
-        return o - 97 + 26
-    if 48 <= o <= 57:  # 0-9
-        return o - 48 + 52
-    if ch == "-":
-        return 62
-    if ch == "_":
-        return 63
-    raise ValueError(f"Invalid base64url character: {ch}")
+    try:
+        return _B64URL_VALUE[ch]
+    except KeyError:
+        raise ValueError(f"Invalid base64url character: {ch}") from None
 
 
 def base64url_bits(ch: str) -> List[int]:
     """6 high-to-low bits of a single base64url character."""
-    v = base64url_value(ch)
-    return [(v >> (5 - j)) & 1 for j in range(6)]
+    return list(_B64URL_BITS[base64url_value(ch)])
 
 
 def char_variants(ch: str, case_sensitive: bool) -> List[str]:
@@ -259,45 +293,55 @@ def is_base64url(s: str) -> bool:
     return all(c.isalnum() or c in "-_" for c in s)
 
 
-def bits_to_padded_bytes(bits: Sequence[int]) -> bytes:
+def bits_to_padded_bytes(acc: int, nbits: int) -> bytes:
     """TON padding: add 1 then zeros to byte boundary."""
-    byte_len = (len(bits) + 7) // 8
+    byte_len = (nbits + 7) // 8
     if byte_len == 0:
         return b""
 
-    padded = list(bits)
-    padding = byte_len * 8 - len(bits)
+    padding = byte_len * 8 - nbits
     if padding:
-        padded.append(1)
-        padded.extend([0] * (padding - 1))
-
-    out = []
-    for i in range(0, len(padded), 8):
-        val = 0
-        for bit in padded[i : i + 8]:
-            val = (val << 1) | bit
-        out.append(val)
-    return bytes(out)
+        acc = (acc << padding) | (1 << (padding - 1))
+    return acc.to_bytes(byte_len, "big")
 
 
 def crc16_table() -> List[int]:
     poly = 0x1021
-    table = []
-    for i in range(256):
-        crc = i << 8
-        for _ in range(8):
-            if crc & 0x8000:
-                crc = ((crc << 1) ^ poly) & 0xFFFF
-            else:
-                crc = (crc << 1) & 0xFFFF
-        table.append(crc)
-    return table
-
-
-def crc16(data: bytes, table: Sequence[int]) -> int:
+    crc = np.arange(256, dtype=np.uint32) << 8
+    for _ in range(8):
+        crc = np.where(crc & 0x8000, (crc << 1) ^ poly, crc << 1) & 0xFFFF
+    return crc.tolist()
+
+
+def crc16_slice_tables(table: Sequence[int]) -> List[List[int]]:
+    """Slice-by-8 tables: tables[k][v] is the CRC of byte v followed by k zero bytes."""
+    t0 = np.asarray(table, dtype=np.uint32)
+    tables = [t0]
+    for _ in range(7):
+        prev = tables[-1]
+        tables.append(((prev << 8) & 0xFFFF) ^ t0[prev >> 8])
+    return [t.tolist() for t in tables]
+
+
+def crc16(data: bytes, tables: Sequence[Sequence[int]]) -> int:
+    """CRC16/XMODEM using slice-by-8 tables from crc16_slice_tables()."""
+    t0, t1, t2, t3, t4, t5, t6, t7 = tables
     crc = 0
-    for b in data:
-        crc = ((crc << 8) ^ table[((crc >> 8) ^ b) & 0xFF]) & 0xFFFF
+    n = len(data) & ~7
+    for i in range(0, n, 8):
+        b0, b1, b2, b3, b4, b5, b6, b7 = data[i : i + 8]
+        crc = (
+            t7[b0 ^ (crc >> 8)]
+            ^ t6[b1 ^ (crc & 0xFF)]
+            ^ t5[b2]
+            ^ t4[b3]
+            ^ t3[b4]
+            ^ t2[b5]
+            ^ t1[b6]
+            ^ t0[b7]
+        )
+    for b in data[n:]:
+        crc = ((crc << 8) ^ t0[((crc >> 8) ^ b) & 0xFF]) & 0xFFFF
     return crc
 
 
@@ -310,11 +354,12 @@ def crc16_delta_pos2_34(table: Sequence[int]) -> List[int]:
     where crc_base is crc16(msg_with_hash0=0) for the fixed part of the message.
     """
 
+    tables = crc16_slice_tables(table)
     msg = bytearray(34)
     out: List[int] = []
     for v in range(256):
         msg[2] = v
-        out.append(crc16(bytes(msg), table))
+        out.append(crc16(bytes(msg), tables))
     return out
 
 
@@ -360,59 +405,27 @@ def compute_hit_prob(kernel_cfg: "KernelConfig") -> float:
 # -----------------------------------------------------------------------------
 
 
-def _rotr(x, n):
-    return ((x >> n) | ((x & 0xFFFFFFFF) << (32 - n))) & 0xFFFFFFFF
-
-
-def _shr(x, n):
-    return (x & 0xFFFFFFFF) >> n
-
-
-def _sigma0(x):
-    return _rotr(x, 7) ^ _rotr(x, 18) ^ _shr(x, 3)
-
-
-def _sigma1(x):
-    return _rotr(x, 17) ^ _rotr(x, 19) ^ _shr(x, 10)
-
-
-def _Sigma0(x):
-    return _rotr(x, 2) ^ _rotr(x, 13) ^ _rotr(x, 22)
-
-
-def _Sigma1(x):
-    return _rotr(x, 6) ^ _rotr(x, 11) ^ _rotr(x, 25)
-
-
 def sha256_compress_block(block: bytes, state=None) -> List[int]:
     """Single SHA-256 compression on one 64-byte block."""
     assert len(block) == 64, "Block must be exactly 64 bytes"
 
-    if state is None:
-        a, b, c, d, e, f, g, h = (
-            0x6A09E667,
-            0xBB67AE85,
-            0x3C6EF372,
-            0xA54FF53A,
-            0x510E527F,
-            0x9B05688C,
-            0x1F83D9AB,
-            0x5BE0CD19,
-        )
-    else:
-        a, b, c, d, e, f, g, h = state
+    iv = SHA256_IV if state is None else state
+    a, b, c, d, e, f, g, h = iv
 
-    w = [0] * 64
-    for i in range(16):
-        (w[i],) = struct.unpack(">I", block[i * 4 : (i + 1) * 4])
+    # Rotations are inlined; bits shifted past 32 are dropped by the masks below.
+    w = list(struct.unpack(">16I", block))
     for i in range(16, 64):
-        w[i] = (
-            _sigma1(w[i - 2]) + w[i - 7] + _sigma0(w[i - 15]) + w[i - 16]
-        ) & 0xFFFFFFFF
-
-    for i in range(64):
-        t1 = (h + _Sigma1(e) + ((e & f) ^ (~e & g)) + K_SHA256[i] + w[i]) & 0xFFFFFFFF
-        t2 = (_Sigma0(a) + ((a & b) ^ (a & c) ^ (b & c))) & 0xFFFFFFFF
+        x = w[i - 15]
+        y = w[i - 2]
+        s0 = ((x >> 7) | (x << 25)) ^ ((x >> 18) | (x << 14)) ^ (x >> 3)
+        s1 = ((y >> 17) | (y << 15)) ^ ((y >> 19) | (y << 13)) ^ (y >> 10)
+        w.append((w[i - 16] + s0 + w[i - 7] + s1) & 0xFFFFFFFF)
+
+    for k, wi in zip(K_SHA256, w):
+        s1 = ((e >> 6) | (e << 26)) ^ ((e >> 11) | (e << 21)) ^ ((e >> 25) | (e << 7))
+        t1 = h + s1 + ((e & f) ^ (~e & g)) + k + wi
+        s0 = ((a >> 2) | (a << 30)) ^ ((a >> 13) | (a << 19)) ^ ((a >> 22) | (a << 10))
+        t2 = s0 + ((a & b) ^ (a & c) ^ (b & c))
         h = g
         g = f
         f = e
@@ -422,91 +435,66 @@ def sha256_compress_block(block: bytes, state=None) -> List[int]:
         b = a
         a = (t1 + t2) & 0xFFFFFFFF
 
-    return [
-        (state[0] + a) & 0xFFFFFFFF if state else (0x6A09E667 + a) & 0xFFFFFFFF,
-        (state[1] + b) & 0xFFFFFFFF if state else (0xBB67AE85 + b) & 0xFFFFFFFF,
-        (state[2] + c) & 0xFFFFFFFF if state else (0x3C6EF372 + c) & 0xFFFFFFFF,
-        (state[3] + d) & 0xFFFFFFFF if state else (0xA54FF53A + d) & 0xFFFFFFFF,
-        (state[4] + e) & 0xFFFFFFFF if state else (0x510E527F + e) & 0xFFFFFFFF,
-        (state[5] + f) & 0xFFFFFFFF if state else (0x9B05688C + f) & 0xFFFFFFFF,
-        (state[6] + g) & 0xFFFFFFFF if state else (0x1F83D9AB + g) & 0xFFFFFFFF,
-        (state[7] + h) & 0xFFFFFFFF if state else (0x5BE0CD19 + h) & 0xFFFFFFFF,
-    ]
+    return [(x + y) & 0xFFFFFFFF for x, y in zip(iv, (a, b, c, d, e, f, g, h))]
 
 
-def owner_bits(owner_raw: bytes) -> List[int]:
-    """Bits of MsgAddressInt: tag(2), anycast(1), workchain(8), addr hash(256)."""
+def owner_bits(owner_raw: bytes) -> int:
+    """267-bit MsgAddressInt: tag(2), anycast(1), workchain(8), addr hash(256)."""
     workchain = owner_raw[1]
     addr_hash = owner_raw[2:34]
 
-    bits: List[int] = [1, 0]  # tag
-    bits.append(0)  # anycast none
+    acc, nbits = 0b10, 2  # tag
+    acc, nbits = append_bits(acc, nbits, 0, 1)  # anycast none
+    acc, nbits = append_bits(acc, nbits, workchain, 8)
+    acc, nbits = append_bits(acc, nbits, int.from_bytes(addr_hash, "big"), 256)
 
-    wc_signed = workchain if workchain < 128 else workchain - 256
-    wc_byte = wc_signed & 0xFF
-    bits.extend(bits_from_byte(wc_byte))
-
-    for b in addr_hash:
-        bits.extend(bits_from_byte(b))
-
-    assert len(bits) == 267, "Unexpected owner bits length"
-    return bits
+    assert nbits == 267, "Unexpected owner bits length"
+    return acc
 
 
 def build_code_repr(owner_raw: bytes, salt_16: bytes) -> bytes:
     """Serialize code cell: const bits + owner + const + salt (total 80 bytes)."""
     assert len(salt_16) == 16, "Salt must be 16 bytes (128 bits)"
 
-    bits: List[int] = []
-    bits += int_to_bits(CONST1, 50)
-    bits += owner_bits(owner_raw)
-    bits += int_to_bits(CONST2, 179)
-    for b in salt_16:
-        bits += bits_from_byte(b)
-
-    assert len(bits) == 624, "Unexpected code bits length"
+    acc, nbits = append_bits(0, 0, CONST1, 50)
+    acc, nbits = append_bits(acc, nbits, owner_bits(owner_raw), 267)
+    acc, nbits = append_bits(acc, nbits, CONST2, 179)
+    acc, nbits = append_bits(acc, nbits, int.from_bytes(salt_16, "big"), 128)
 
-    data_bytes = []
-    for i in range(0, len(bits), 8):
-        val = 0
-        for bit in bits[i : i + 8]:
-            val = (val << 1) | bit
-        data_bytes.append(val)
+    assert nbits == 624, "Unexpected code bits length"
 
-    b = len(bits)
     d1 = 0x00  # 0 refs
-    d2 = (b // 8) + ((b + 7) // 8)  # floor(b/8) + ceil(b/8)
-    return bytes([d1, d2]) + bytes(data_bytes)
+    d2 = (nbits // 8) + ((nbits + 7) // 8)  # floor(b/8) + ceil(b/8)
+    return bytes([d1, d2]) + acc.to_bytes(nbits // 8, "big")
 
 
 def build_stateinit_prefix(
     fixed_prefix_length: Optional[int], special: Optional[Tuple[int, int]]
 ) -> bytes:
     """Prefix bytes (descriptors + padded bits + ref depth) of StateInit cell."""
-    bits: List[int] = []
+    acc, nbits = 0, 0
 
     if fixed_prefix_length is not None:
         if not (0 <= fixed_prefix_length < 32):
             raise ValueError("fixedPrefixLength must be 0..31")
-        bits.append(1)
-        bits += int_to_bits(fixed_prefix_length, 5)
+        acc, nbits = append_bits(acc, nbits, 1, 1)
+        acc, nbits = append_bits(acc, nbits, fixed_prefix_length, 5)
     else:
-        bits.append(0)
+        acc, nbits = append_bits(acc, nbits, 0, 1)
 
     if special is not None:
         tick, tock = special
-        bits.append(1)
-        bits.append(1 if tick else 0)
-        bits.append(1 if tock else 0)
+        acc, nbits = append_bits(acc, nbits, 1, 1)
+        acc, nbits = append_bits(acc, nbits, 1 if tick else 0, 1)
+        acc, nbits = append_bits(acc, nbits, 1 if tock else 0, 1)
     else:
-        bits.append(0)
+        acc, nbits = append_bits(acc, nbits, 0, 1)
 
-    bits.append(1)  # code: Some
-    bits.append(0)  # data: None
-    bits.append(0)  # libraries: empty dict
+    # code: Some, data: None, libraries: empty dict
+    acc, nbits = append_bits(acc, nbits, 0b100, 3)
 
-    padded_bits = bits_to_padded_bytes(bits)
-    bits_desc = ((len(bits) + 7) // 8) + (len(bits) // 8)  # ceil + floor
+    padded_bits = bits_to_padded_bytes(acc, nbits)
+    bits_desc = ((nbits + 7) // 8) + (nbits // 8)  # ceil + floor
 
     d1 = 1  # ordinary cell, level mask 0, 1 ref
     d2 = bits_desc
@@ -515,12 +503,8 @@ def build_stateinit_prefix(
 
 
 def pack_prefix_words(prefix: bytes) -> List[int]:
-    words = [0] * 16
-    for i, b in enumerate(prefix):
-        w = i >> 2
-        shift = 24 - ((i & 3) * 8)
-        words[w] |= int(b) << shift
-    return words
+    """Big-endian 32-bit words of prefix, zero-padded to one 64-byte block."""
+    return np.frombuffer(prefix.ljust(64, b"\x00"), dtype=">u4").tolist()
 
 
 def to_boc_single_cell(cell_bytes: bytes) -> bytes:
@@ -592,6 +576,11 @@ def choose_start_alignment(
         return 0, []
 
     char_opts = [char_bit_variants(ch, case_sensitive) for ch in start]
+    char_vals = [
+        [sum(bit << (5 - k) for k, bit in enumerate(var)) for var in variants]
+        for variants in char_opts
+    ]
+    pref22 = sum(bit << (21 - k) for k, bit in enumerate(prefix_bits[:16]))
     len_bits = len(start) * 6
     max_digit_offset = (TOTAL_BITS - len_bits) // 6
 
@@ -602,15 +591,19 @@ def choose_start_alignment(
 
         for ci, variants in enumerate(char_opts):
             char_bit_base = bit_offset + ci * 6
-            overlap = [b for b in range(6) if char_bit_base + b < 16]
-            if not overlap:
+            if char_bit_base >= 16:
                 filtered.append(variants)
                 continue
 
-            valid = []
-            for var in variants:
-                if all(var[b] == prefix_bits[char_bit_base + b] for b in overlap):
-                    valid.append(var)
+            # Place the digit on the fixed bits (shifted up by 6 so a digit
+            # hanging past bit 15 needs no right shift); compare the overlap.
+            shift = 16 - char_bit_base
+            mask = (0x3F << shift) & 0x3FFFC0
+            valid = [
+                var
+                for var, v in zip(variants, char_vals[ci])
+                if ((v << shift) ^ pref22) & mask == 0
+            ]
             if not valid:
                 ok = False
                 break
@@ -724,10 +717,11 @@ def build_kernel_config(cli: CliConfig, owner_raw: bytes) -> Tuple[KernelConfig,
             bit = next(iter(allowed_bits))
             set_mask_bit(prefix_mask, prefix_val, bit_index, bit)
 
-    prefix_pos = [i for i, m in enumerate(prefix_mask) if m]
+    mask_arr = np.asarray(prefix_mask, dtype=np.uint8)
+    prefix_pos = np.flatnonzero(mask_arr).tolist()
     # Host-side invariant: early non-CRC prefix checks never include bytes 0..2
     # (flags/workchain + swept hash0) and never include CRC bytes 34..35.
-    prefix_pos_nocrc = [i for i in prefix_pos if 3 <= i < 34]
+    prefix_pos_nocrc = (np.flatnonzero(mask_arr[3:34]) + 3).tolist()
     assert all(3 <= i < 34 for i in prefix_pos_nocrc), (
         "prefix_pos_nocrc invariant violated"
     )
@@ -851,70 +845,69 @@ def build_kernel_config(cli: CliConfig, owner_raw: bytes) -> Tuple[KernelConfig,
 # -----------------------------------------------------------------------------
 
 
+_TAG_RE = re.compile(r"<<([A-Z0-9_]+)>>")
+
+
 def render_kernel(kernel_cfg: KernelConfig) -> str:
     kernel_path = os.path.join(os.path.dirname(__file__), "kernel.cl")
     with open(kernel_path, "r", encoding="utf-8") as f:
         src = f.read()
 
-    def repl(tag: str, value: str):
-        nonlocal src
-        src = src.replace(tag, value)
-
-    repl(
-        "<<CODE_PREFIX_BYTES>>", ", ".join(str(b) for b in kernel_cfg.code_prefix_bytes)
-    )
-    repl(
-        "<<CODE_STATE_BASE>>",
-        ", ".join(f"0x{w:08x}u" for w in kernel_cfg.code_state_base),
-    )
-    repl("<<CRC16_TABLE>>", ", ".join(str(c) for c in kernel_cfg.crc16_table))
-    repl(
-        "<<CRC16_DELTA_POS2>>",
-        ", ".join(str(c) for c in kernel_cfg.crc16_delta_pos2),
-    )
-    repl(
-        "<<PREFIX_W_MATRIX>>",
-        ",\n    ".join(
+    tags = {
+        "CODE_PREFIX_BYTES": ", ".join(str(b) for b in kernel_cfg.code_prefix_bytes),
+        "CODE_STATE_BASE": ", ".join(f"0x{w:08x}u" for w in kernel_cfg.code_state_base),
+        "CRC16_TABLE": ", ".join(str(c) for c in kernel_cfg.crc16_table),
+        "CRC16_DELTA_POS2": ", ".join(str(c) for c in kernel_cfg.crc16_delta_pos2),
+        "PREFIX_W_MATRIX": ",\n    ".join(
             "{ " + ", ".join(str(w) for w in row) + " }"
             for row in kernel_cfg.prefix_w_matrix
         ),
-    )
-    repl("<<PREFIX_MASK>>", ", ".join(str(b) for b in kernel_cfg.prefix_mask))
-    repl("<<PREFIX_VAL>>", ", ".join(str(b) for b in kernel_cfg.prefix_val))
-    repl("<<NEED_CRC>>", str(kernel_cfg.need_crc))
-    repl("<<HASH0_COUNT>>", str(kernel_cfg.hash0_count))
-    repl("<<HASH0_VALUES>>", ", ".join(str(v) for v in kernel_cfg.hash0_values))
-    repl("<<N_ACTIVE>>", str(len(kernel_cfg.prefix_pos)))
-    repl("<<N_ACTIVE_NOCRC>>", str(len(kernel_cfg.prefix_pos_nocrc)))
-    repl("<<PREFIX_POS>>", ", ".join(str(i) for i in kernel_cfg.prefix_pos))
-    repl("<<PREFIX_POS_NOCRC>>", ", ".join(str(i) for i in kernel_cfg.prefix_pos_nocrc))
-    repl("<<N_CASE_CONST>>", str(len(kernel_cfg.ci_const_bitpos)))
-    repl("<<N_CASE_VAR>>", str(len(kernel_cfg.ci_var_bitpos)))
-    repl("<<CASE_CONST_BITPOS>>", ", ".join(str(b) for b in kernel_cfg.ci_const_bitpos))
-    repl("<<CASE_CONST_ALT0>>", ", ".join(str(v) for v in kernel_cfg.ci_const_alt0))
-    repl("<<CASE_CONST_ALT1>>", ", ".join(str(v) for v in kernel_cfg.ci_const_alt1))
-    repl("<<CASE_VAR_BITPOS>>", ", ".join(str(b) for b in kernel_cfg.ci_var_bitpos))
-    repl("<<CASE_VAR_ALT0>>", ", ".join(str(v) for v in kernel_cfg.ci_var_alt0))
-    repl("<<CASE_VAR_ALT1>>", ", ".join(str(v) for v in kernel_cfg.ci_var_alt1))
-    repl("<<N_STATEINIT_VARIANTS>>", str(len(kernel_cfg.stateinit_variants)))
-    repl("<<STATEINIT_PREFIX_MAX_LEN>>", str(kernel_cfg.stateinit_prefix_max_len))
-    repl(
-        "<<STATEINIT_PREFIX_MATRIX>>",
-        ",\n    ".join(
+        "NEED_CRC": str(kernel_cfg.need_crc),
+        "CRC_HI_MASK": str(kernel_cfg.prefix_mask[34]),
+        "CRC_HI_VAL": str(kernel_cfg.prefix_val[34]),
+        "CRC_LO_MASK": str(kernel_cfg.prefix_mask[35]),
+        "CRC_LO_VAL": str(kernel_cfg.prefix_val[35]),
+        "HASH0_COUNT": str(kernel_cfg.hash0_count),
+        "HASH0_VALUES": ", ".join(str(v) for v in kernel_cfg.hash0_values),
+        "N_ACTIVE": str(len(kernel_cfg.prefix_pos)),
+        "PREFIX_POS": ", ".join(str(i) for i in kernel_cfg.prefix_pos),
+        "PREFIX_CHECK_INLINE": "\n            ".join(
+            f"if ((GET_BYTE_BE_ARRAY(main_hash, {i - 2}) & {kernel_cfg.prefix_mask[i]}u)"
+            f" != {kernel_cfg.prefix_val[i]}u) continue;"
+            for i in kernel_cfg.prefix_pos_nocrc
+        ),
+        "N_CASE_CONST": str(len(kernel_cfg.ci_const_bitpos)),
+        "N_CASE_VAR": str(len(kernel_cfg.ci_var_bitpos)),
+        "CASE_CONST_CHECK_INLINE": "\n            ".join(
+            f"{{ const uchar d = repr_digit({b}, (uchar)0, main_hash, (ushort)0);"
+            f" if (d != {a0}u && d != {a1}u) continue; }}"
+            for b, a0, a1 in zip(
+                kernel_cfg.ci_const_bitpos,
+                kernel_cfg.ci_const_alt0,
+                kernel_cfg.ci_const_alt1,
+            )
+        ),
+        "CASE_VAR_BITPOS": ", ".join(str(b) for b in kernel_cfg.ci_var_bitpos),
+        "CASE_VAR_ALT0": ", ".join(str(v) for v in kernel_cfg.ci_var_alt0),
+        "CASE_VAR_ALT1": ", ".join(str(v) for v in kernel_cfg.ci_var_alt1),
+        "N_STATEINIT_VARIANTS": str(len(kernel_cfg.stateinit_variants)),
+        "STATEINIT_PREFIX_MAX_LEN": str(kernel_cfg.stateinit_prefix_max_len),
+        "STATEINIT_PREFIX_MATRIX": ",\n    ".join(
             "{ " + ", ".join(str(b) for b in row) + " }"
             for row in kernel_cfg.stateinit_prefix_padded
         ),
-    )
-    repl(
-        "<<STATEINIT_PREFIX_LENS>>",
-        ", ".join(str(length) for length in kernel_cfg.stateinit_prefix_lens),
-    )
-    repl("<<FLAGS_HI>>", str(kernel_cfg.flags_hi))
-    repl("<<FLAGS_LO>>", str(kernel_cfg.flags_lo))
-    repl("<<FREE_HASH_MASK>>", str(kernel_cfg.free_hash_mask))
-    repl("<<FREE_HASH_VAL>>", str(kernel_cfg.free_hash_val))
-
-    return src
+        "STATEINIT_PREFIX_LENS": ", ".join(
+            str(length) for length in kernel_cfg.stateinit_prefix_lens
+        ),
+        "FLAGS_HI": str(kernel_cfg.flags_hi),
+        "FLAGS_LO": str(kernel_cfg.flags_lo),
+        "FREE_HASH_MASK": str(kernel_cfg.free_hash_mask),
+        "FREE_HASH_VAL": str(kernel_cfg.free_hash_val),
+        "RES_HEAD_WORDS": str(RES_HEAD_WORDS),
+        "RES_SLOTS": f"{RES_SLOTS}u",
+    }
+    # One pass over the source; unknown tags are left for check_kernel to report.
+    return _TAG_RE.sub(lambda m: tags.get(m.group(1), m.group(0)), src)
 
 
 # -----------------------------------------------------------------------------
@@ -928,27 +921,223 @@ def pick_device_params(device: cl.Device, n_variants: int) -> DeviceParams:
 
     if "nvidia" in vendor:
         base_threads = cu * 2048
-        local = 256
         iters = 4096
     elif "advanced micro devices" in vendor or "amd" in vendor:
         base_threads = cu * 2048
-        local = 256
         iters = 4096
     elif "apple" in vendor:
         base_threads = cu * 1024
-        local = 256
         iters = 2048
     else:  # intel / others / cpu
         base_threads = cu * 1024
-        local = 128
         iters = 2048
 
     if n_variants > 0:
         iters = max(512, int(iters / n_variants))
 
-    local = min(local, device.max_work_group_size)
+    # local_size is filled in from the built kernel by pick_local_size()
+    return DeviceParams(global_threads=base_threads, local_size=None, iterations=iters)
 
-    return DeviceParams(global_threads=base_threads, local_size=local, iterations=iters)
+
+def host_unified_memory(device: cl.Device) -> bool:
+    """True when the device shares physical memory with the host (iGPU, CPU)."""
+    try:
+        return bool(device.host_unified_memory)
+    except cl.Error:  # query deprecated since OpenCL 2.0; assume discrete
+        return False
+
+
+def pick_default_devices(
+    all_devices: List[Tuple[int, cl.Platform, cl.Device]],
+) -> List[Tuple[int, cl.Platform, cl.Device]]:
+    """
+    Default selection: the GPUs/accelerators of the platform with the most
+    compute (compute units x clock), without its integrated GPUs when it also
+    has a discrete one. Falls back to every device when there is no GPU.
+    """
+    accel = cl.device_type.GPU | cl.device_type.ACCELERATOR
+    by_platform: dict[cl.Platform, List[Tuple[int, cl.Platform, cl.Device]]] = {}
+    for entry in all_devices:
+        if entry[2].type & accel:
+            by_platform.setdefault(entry[1], []).append(entry)
+    if not by_platform:
+        return all_devices
+
+    def compute(dev: cl.Device) -> int:
+        return (dev.max_compute_units or 1) * (dev.max_clock_frequency or 1)
+
+    best = max(
+        by_platform.values(), key=lambda entries: sum(compute(e[2]) for e in entries)
+    )
+    discrete = [e for e in best if not host_unified_memory(e[2])]
+    return discrete or best
+
+
+def pick_local_size(kernel: cl.Kernel, device: cl.Device) -> int:
+    """
+    Largest multiple of the kernel's preferred work-group size multiple (warp /
+    wavefront width) up to LOCAL_SIZE_TARGET, clamped by the kernel's limit.
+    """
+    wgi = cl.kernel_work_group_info
+    multiple = kernel.get_work_group_info(
+        wgi.PREFERRED_WORK_GROUP_SIZE_MULTIPLE, device
+    )
+    max_local = kernel.get_work_group_info(wgi.WORK_GROUP_SIZE, device)
+    local = multiple * max(1, LOCAL_SIZE_TARGET // multiple)
+    if local > max_local:
+        local = max(multiple, max_local // multiple * multiple)
+    return min(local, max_local)
+
+
+def tune_cache_path(device: cl.Device) -> str:
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", device.name.strip())
+    return os.path.join(TUNE_CACHE_DIR, f"tune-{name}.json")
+
+
+def load_tuned_params(
+    device: cl.Device, n_variants: int, kernel: cl.Kernel
+) -> Optional[DeviceParams]:
+    """
+    Cached `--tune` result for this device and variant count, if any. The kernel
+    is specialized per pattern, so a cached work-group size that this build's
+    kernel cannot run (or that breaks its preferred multiple) is ignored.
+    """
+    try:
+        with open(tune_cache_path(device)) as f:
+            entry = json.load(f)[str(n_variants)]
+        params = DeviceParams(
+            global_threads=int(entry["global_threads"]),
+            local_size=int(entry["local_size"]),
+            iterations=int(entry["iterations"]),
+        )
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if params.local_size <= 0 or params.global_threads % params.local_size:
+        return None
+    wgi = cl.kernel_work_group_info
+    multiple = kernel.get_work_group_info(
+        wgi.PREFERRED_WORK_GROUP_SIZE_MULTIPLE, device
+    )
+    max_local = kernel.get_work_group_info(wgi.WORK_GROUP_SIZE, device)
+    if params.local_size > max_local or params.local_size % multiple:
+        return None
+    return params
+
+
+# Identical cards share a cache file, so their device threads serialize the
+# read-modify-write of it.
+_TUNE_CACHE_LOCK = Lock()
+
+
+def save_tuned_params(device: cl.Device, n_variants: int, params: DeviceParams):
+    """
+    Merge this result into the device's cache file. The file is replaced
+    atomically so a concurrent reader never sees it half-written.
+    """
+    path = tune_cache_path(device)
+    with _TUNE_CACHE_LOCK:
+        try:
+            with open(path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = None
+        if not isinstance(cache, dict):
+            cache = {}
+        cache[str(n_variants)] = {
+            "global_threads": params.global_threads,
+            "local_size": params.local_size,
+            "iterations": params.iterations,
+        }
+        os.makedirs(TUNE_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=TUNE_CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(cache, f, indent=2)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def autotune(
+    device: cl.Device,
+    context: cl.Context,
+    program: cl.Program,
+    params: DeviceParams,
+    ctx: "SearchContext",
+) -> DeviceParams:
+    """
+    Coordinate search over work-group size, then iterations per launch, then
+    global size, starting from `params`. Each candidate is scored by salts
+    hashed per second over TUNE_TRIALS back-to-back launches and must beat the
+    current best by TUNE_MIN_GAIN, so timing noise keeps the defaults.
+    """
+    queue = cl.CommandQueue(context, device=device, properties=0)
+    mf = cl.mem_flags
+    knl = cl.Kernel(program, "hash_main")
+    for i, word in enumerate(struct.unpack("<4I", os.urandom(16))):
+        knl.set_arg(1 + i, np.uint32(word))
+    # Trial hits are discarded; the kernel stops storing them past RES_SLOTS.
+    state_g = cl.Buffer(context, mf.READ_WRITE, size=STATE_WORDS * 4)
+    knl.set_arg(5, state_g)
+
+    wgi = cl.kernel_work_group_info
+    multiple = knl.get_work_group_info(wgi.PREFERRED_WORK_GROUP_SIZE_MULTIPLE, device)
+    max_local = knl.get_work_group_info(wgi.WORK_GROUP_SIZE, device)
+    local_sizes = [
+        size
+        for size in TUNE_LOCAL_SIZES
+        if size % multiple == 0 and size <= max_local and size != params.local_size
+    ]
+
+    def candidate(global_threads: float, local: int, iterations: float):
+        global_threads = max(local, -(-int(global_threads) // local) * local)
+        return DeviceParams(global_threads, local, max(1, int(iterations)))
+
+    def rate(p: DeviceParams) -> float:
+        knl.set_arg(0, np.int32(p.iterations))
+        # Start each timed run from a zeroed hit counter, as real launches do.
+        cl.enqueue_fill_buffer(queue, state_g, np.uint32(0), 0, RES_HEAD_WORDS * 4)
+        queue.finish()
+        start = time.perf_counter()
+        for _ in range(TUNE_TRIALS):
+            cl.enqueue_nd_range_kernel(queue, knl, (p.global_threads,), (p.local_size,))
+        queue.finish()
+        return p.global_threads * p.iterations / (time.perf_counter() - start)
+
+    rate(params)  # warm-up: the first launch pays for lazy driver setup
+    best, best_rate = params, rate(params)
+
+    def consider(candidates: List[DeviceParams]):
+        nonlocal best, best_rate
+        for p in candidates:
+            if ctx.stop_flag:
+                return
+            r = rate(p)
+            if r > best_rate * TUNE_MIN_GAIN:
+                best, best_rate = p, r
+
+    consider(
+        [
+            candidate(params.global_threads, size, params.iterations)
+            for size in local_sizes
+        ]
+    )
+    consider(
+        [
+            candidate(best.global_threads, best.local_size, params.iterations * scale)
+            for scale in TUNE_ITER_SCALES
+            if scale != 1.0
+        ]
+    )
+    consider(
+        [
+            candidate(params.global_threads * scale, best.local_size, best.iterations)
+            for scale in TUNE_GLOBAL_SCALES
+            if scale != 1.0
+        ]
+    )
+    return best
 
 
 # -----------------------------------------------------------------------------
@@ -968,95 +1157,165 @@ class SearchContext:
         self.cli = cli
         self.owner_raw = owner_raw
         self.start_digit_base = start_digit_base
-        self.crc_table = kernel_cfg.crc16_table
+        # Patterns as the bytes record_hit compares against (lowercased for CI)
+        start, end = cli.start or "", cli.end or ""
+        if not cli.case_sensitive:
+            start, end = start.lower(), end.lower()
+        self.start_target = start.encode("ascii")
+        self.end_target = end.encode("ascii")
+        self.start_digit_end = start_digit_base + len(start)
+        self.crc_tables = crc16_slice_tables(kernel_cfg.crc16_table)
+        # (stateinit prefix, fixedPrefixLength, special) per kernel variant index
+        n_special = len(kernel_cfg.special_variants)
+        self.variant_table = tuple(
+            (
+                prefix,
+                kernel_cfg.fixed_prefix_lengths[i // n_special],
+                kernel_cfg.special_variants[i % n_special],
+            )
+            for i, prefix in enumerate(kernel_cfg.stateinit_variants)
+        )
+        # Code cell with a zero salt: descriptor bytes plus the 624 data bits as
+        # one int whose low 128 bits (the salt) are zero, so hits only OR it in.
+        code_repr_zero = build_code_repr(owner_raw, b"\x00" * 16)
+        self.code_repr_head = code_repr_zero[:2]
+        self.code_repr_base = int.from_bytes(code_repr_zero[2:], "big")
+        # SHA-256 midstate after the salt-independent first block (the host
+        # counterpart of code_state_base in the kernel).
+        self.code_hash_base = hashlib.sha256(code_repr_zero[:64])
+        # Every code cell has the same length, so the BoC header is constant.
+        assert len(code_repr_zero) == 80, "unexpected code cell repr length"
+        self.boc_header = to_boc_single_cell(code_repr_zero)[:-80]
+        self.prefix_mask_arr = np.array(kernel_cfg.prefix_mask, dtype=np.uint8)
+        self.prefix_val_arr = np.array(kernel_cfg.prefix_val, dtype=np.uint8)
         self.stop_flag = False
         self.n_found = 0
-        self.total_iters = 0.0
-        self.status = SearchStats(variants=len(kernel_cfg.stateinit_variants))
-        self.status_lock = Lock()
-        self.output_lock = Lock()
+        # One stats slot and iteration counter per device thread. Each is only
+        # written by its own thread, and stats are replaced wholesale, so the
+        # reporter can read them without a lock.
+        self.device_stats: List[SearchStats] = []
+        self.device_iters: List[float] = []
+        # Device threads still running; the last one to exit sets done_event.
+        self.devices_running = 0
+        self.devices_lock = Lock()
+        self.done_event = Event()
+        # (base_salt, hit rows) batches for validator_thread; None ends it.
+        self.hit_queue: Queue[Optional[Tuple[bytes, np.ndarray]]] = Queue()
+        # JSON lines for writer_thread; None tells it to finish.
+        self.write_queue: Queue[Optional[str]] = Queue()
         self.output_file = open("addresses.jsonl", "a", encoding="utf-8")
         self.hit_prob = compute_hit_prob(kernel_cfg)
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
 
 
-def process_hit(
-    ctx: SearchContext,
-    base_salt: bytes,
-    iter_idx: int,
-    idx: int,
-    variant_idx: int,
-    hash0: int,
-) -> tuple[bool, str]:
-    """Rebuild candidate, verify, and persist. Returns (ok, reason)."""
-
-    cfg = ctx.kernel_cfg
-    cli = ctx.cli
+# Salt words 0..1 that the kernel XORs with the iteration and global id
+_SALT_HEAD = struct.Struct("<II")
 
-    if variant_idx >= len(cfg.stateinit_variants):
-        return False, "variant_idx out of range"
 
-    salt_bytes = bytearray(base_salt)
-    salt_words = np.frombuffer(salt_bytes, dtype=np.uint32)
-    salt_words[0] ^= np.uint32(iter_idx)
-    salt_words[1] ^= np.uint32(idx)
+def process_hits(
+    ctx: SearchContext, base_salt: bytes, hits: np.ndarray
+) -> tuple[bool, str, int]:
+    """
+    Rebuild, verify, and persist a batch of kernel hits. `hits` holds one
+    (iter, idx, variant, hash0) row per result slot. Returns (ok, reason, row),
+    where row is the offending hit on failure.
+    """
 
-    code_repr = build_code_repr(ctx.owner_raw, bytes(salt_bytes))
-    code_hash = hashlib.sha256(code_repr).digest()
+    cfg = ctx.kernel_cfg
+    n_hits = len(hits)
 
-    prefix = cfg.stateinit_variants[variant_idx]
-    main_data = bytearray(prefix)
-    main_data.extend(code_hash)
-    main_hash = hashlib.sha256(main_data).digest()
+    bad = np.flatnonzero(hits[:, 2] >= len(cfg.stateinit_variants))
+    if bad.size:
+        return False, "variant_idx out of range", int(bad[0])
 
     # Sanity-check hash0 against forced bits derived from the start pattern.
-    if (hash0 & cfg.free_hash_mask) != (cfg.free_hash_val & cfg.free_hash_mask):
-        return False, "hash0 constraint mismatch"
+    hash0s = hits[:, 3] & 0xFF
+    bad = np.flatnonzero(
+        (hash0s & cfg.free_hash_mask) != (cfg.free_hash_val & cfg.free_hash_mask)
+    )
+    if bad.size:
+        return False, "hash0 constraint mismatch", int(bad[0])
+
+    # Only the SHA-256 chain stays per hit; the byte masks are checked for the
+    # whole batch at once below.
+    cand = bytearray(n_hits * TOTAL_BYTES)
+    code_reprs: List[bytes] = []
+    rows = hits.tolist()  # decode every slot to Python ints in one call
+    w0, w1 = _SALT_HEAD.unpack_from(base_salt)
+    salt_tail = base_salt[8:]
+    for row, (iter_idx, idx, variant_idx, hash0) in enumerate(rows):
+        salt_bytes = _SALT_HEAD.pack(w0 ^ iter_idx, w1 ^ idx) + salt_tail
+
+        code_reprs.append(
+            ctx.code_repr_head
+            + (ctx.code_repr_base | int.from_bytes(salt_bytes, "big")).to_bytes(
+                78, "big"
+            )
+        )
+        # The salt is exactly the last 16 bytes of code_repr, after the first block.
+        code_hasher = ctx.code_hash_base.copy()
+        code_hasher.update(salt_bytes)
+        code_hash = code_hasher.digest()
+
+        prefix = ctx.variant_table[variant_idx][0]
+        main_hash = hashlib.sha256(prefix + code_hash).digest()
+
+        off = row * TOTAL_BYTES
+        cand[off] = cfg.flags_hi
+        cand[off + 1] = cfg.flags_lo
+        cand[off + 2] = hash0 & 0xFF
+        cand[off + 3 : off + 34] = main_hash[1:32]
+        crc_val = crc16(cand[off : off + 34], ctx.crc_tables)
+        cand[off + 34] = (crc_val >> 8) & 0xFF
+        cand[off + 35] = crc_val & 0xFF
 
-    repr_bytes = bytearray(TOTAL_BYTES)
-    repr_bytes[0] = cfg.flags_hi
-    repr_bytes[1] = cfg.flags_lo
-    repr_bytes[2] = hash0
-    repr_bytes[3:34] = main_hash[1:32]
+    # Byte-mask validation (identical to kernel constraints)
+    cand_arr = np.frombuffer(cand, dtype=np.uint8).reshape(n_hits, TOTAL_BYTES)
+    bad = np.flatnonzero(
+        ((cand_arr & ctx.prefix_mask_arr) != ctx.prefix_val_arr).any(axis=1)
+    )
+    if bad.size:
+        return False, "prefix mask mismatch", int(bad[0])
 
-    crc_val = crc16(bytes(repr_bytes[:34]), ctx.crc_table)
-    repr_bytes[34] = (crc_val >> 8) & 0xFF
-    repr_bytes[35] = crc_val & 0xFF
+    for row, (_, _, variant_idx, _) in enumerate(rows):
+        off = row * TOTAL_BYTES
+        ok, reason = record_hit(
+            ctx, bytes(cand[off : off + TOTAL_BYTES]), code_reprs[row], variant_idx
+        )
+        if not ok:
+            return False, reason, row
+    return True, "ok", -1
 
-    # Byte-mask validation (identical to kernel constraints)
-    for i, m in enumerate(cfg.prefix_mask):
-        if m and (repr_bytes[i] & m) != cfg.prefix_val[i]:
-            return False, "prefix mask mismatch"
 
-    # String-level validation
-    addr_str = base64.urlsafe_b64encode(bytes(repr_bytes)).decode("utf-8")
+def record_hit(
+    ctx: SearchContext, repr_bytes: bytes, code_repr: bytes, variant_idx: int
+) -> tuple[bool, str]:
+    """String-level checks for a hit that passed the byte masks, then persist."""
+
+    cli = ctx.cli
+
+    # String-level validation, on the ASCII bytes of the friendly address
+    addr_b64 = base64.urlsafe_b64encode(repr_bytes)
 
     if cli.start:
-        slice_start = addr_str[
-            ctx.start_digit_base : ctx.start_digit_base + len(cli.start)
-        ]
-        if cli.case_sensitive:
-            if slice_start != cli.start:
-                return False, "start mismatch"
-        else:
-            if slice_start.lower() != cli.start.lower():
-                return False, "start mismatch"
+        slice_start = addr_b64[ctx.start_digit_base : ctx.start_digit_end]
+        if not cli.case_sensitive:
+            slice_start = slice_start.lower()
+        if slice_start != ctx.start_target:
+            return False, "start mismatch"
 
     if cli.end:
-        slice_end = addr_str[-len(cli.end) :]
-        if cli.case_sensitive:
-            if slice_end != cli.end:
-                return False, "end mismatch"
-        else:
-            if slice_end.lower() != cli.end.lower():
-                return False, "end mismatch"
+        slice_end = addr_b64[-len(ctx.end_target) :]
+        if not cli.case_sensitive:
+            slice_end = slice_end.lower()
+        if slice_end != ctx.end_target:
+            return False, "end mismatch"
+
+    addr_str = addr_b64.decode("ascii")
 
     # Build output objects
-    split_idx = variant_idx // len(cfg.special_variants)
-    special_idx = variant_idx % len(cfg.special_variants)
-    fpl_val = cfg.fixed_prefix_lengths[split_idx]
-    special = cfg.special_variants[special_idx]
-    boc_code = to_boc_single_cell(code_repr)
+    _, fpl_val, special = ctx.variant_table[variant_idx]
+    boc_code = ctx.boc_header + code_repr
 
     init_obj = {
         "code": base64.urlsafe_b64encode(boc_code).decode("utf-8"),
@@ -1084,130 +1343,298 @@ def process_hit(
         "timestamp": time.time(),
     }
 
-    with ctx.output_lock:
-        ctx.output_file.write(json.dumps(entry, separators=(",", ":")) + "\n")
-        ctx.output_file.flush()
+    ctx.write_queue.put(json.dumps(entry, separators=(",", ":")))
     ctx.n_found += 1
     return True, "ok"
 
 
 def device_thread(
-    dev: cl.Device, context: cl.Context, program: cl.Program, ctx: SearchContext
+    dev: cl.Device,
+    context: cl.Context,
+    program: cl.Program,
+    ctx: SearchContext,
+    stats_idx: int,
 ):
     cfg = ctx.kernel_cfg
-    params = pick_device_params(dev, len(cfg.stateinit_variants))
-
-    queue = cl.CommandQueue(context, device=dev)
+    n_variants = len(cfg.stateinit_variants)
+    params = pick_device_params(dev, n_variants)
     kernel = cl.Kernel(program, "hash_main")
-
+    local = params.local_size = pick_local_size(kernel, dev)
+    # The NDRange must be a whole number of work-groups.
+    params.global_threads = (params.global_threads + local - 1) // local * local
+    if ctx.cli.tune:
+        print(f"Tuning {dev.name}...")
+        params = autotune(dev, context, program, params, ctx)
+        if not ctx.stop_flag:
+            save_tuned_params(dev, n_variants, params)
+            print(
+                f"Tuned {dev.name}: {params.global_threads} threads, "
+                f"local {params.local_size}, {params.iterations} iterations"
+            )
+    else:
+        params = load_tuned_params(dev, n_variants, kernel) or params
+
+    # Both queues live for the whole run and never enable profiling. The
+    # compute queue is out-of-order where supported so the launches of a batch
+    # can overlap; ordering is carried by explicit events instead.
+    ooo = cl.command_queue_properties.OUT_OF_ORDER_EXEC_MODE_ENABLE
+    queue = cl.CommandQueue(context, device=dev, properties=dev.queue_properties & ooo)
+    # Readback runs on its own in-order queue so reading batch N does not wait
+    # for batch N+1, which is already queued behind it on `queue`.
+    read_queue = cl.CommandQueue(context, device=dev, properties=0)
+    local_shape = (params.local_size,)
+    global_shape = (params.global_threads,)
+
+    # Two sets of state buffers: the kernel fills one set while the host
+    # validates the other. Each set holds LAUNCHES_PER_BATCH state areas, one
+    # per launch, as sub-buffers of one buffer; an area is the hit counter
+    # followed by the result slots, so a single map reads a whole batch.
+    # Sub-buffer origins must be aligned to the device's base address alignment.
+    # On unified-memory devices the kernel writes pinned (ALLOC_HOST_PTR)
+    # buffers that the host maps directly (zero-copy). Discrete devices keep
+    # the counters and slots in device memory, next to the atomics, and copy
+    # them into pinned staging buffers that are mapped instead.
+    n_launch = LAUNCHES_PER_BATCH
+    align = max(4, dev.mem_base_addr_align // 8)
+    state_stride = -(-STATE_WORDS * 4 // align) * align
+    zero_copy = host_unified_memory(dev)
     mf = cl.mem_flags
-    res_host = np.zeros(RES_WORDS, dtype=np.uint32)
-    res_g = cl.Buffer(context, mf.READ_WRITE, size=res_host.nbytes)
-    found_count_host = np.zeros(1, dtype=np.uint32)
-    found_count_g = cl.Buffer(
-        context, mf.READ_WRITE | mf.COPY_HOST_PTR, hostbuf=found_count_host
-    )
+    pinned = mf.READ_WRITE | mf.ALLOC_HOST_PTR
+    dev_flags = pinned if zero_copy else mf.READ_WRITE
+    buffers = []
+    for _ in range(2):
+        state_g = cl.Buffer(context, dev_flags, size=n_launch * state_stride)
+        if zero_copy:
+            staging = state_g
+        else:
+            staging = cl.Buffer(context, pinned, size=state_g.size)
+        # One kernel object per launch with its static args bound once; only
+        # the four salt words (args 1..4) change between launches. Kernel args
+        # do not retain their buffers, so the sub-buffers are kept here too.
+        areas = []
+        kernels = []
+        for k in range(n_launch):
+            area = state_g.get_sub_region(k * state_stride, STATE_WORDS * 4)
+            knl = cl.Kernel(program, "hash_main")
+            knl.set_arg(0, np.int32(params.iterations))
+            knl.set_arg(5, area)
+            areas.append(area)
+            kernels.append(knl)
+        buffers.append((state_g, staging, kernels, areas))
+    map_read = cl.map_flags.READ
+
+    state_shape = (n_launch, state_stride // 4)
+
+    def map_state(buf: cl.Buffer, host_buf: cl.Buffer, wait_for) -> np.ndarray:
+        """Blocking read map of a whole state set, one row per launch."""
+        if host_buf is not buf:
+            cl.enqueue_copy(read_queue, host_buf, buf, wait_for=wait_for)
+            wait_for = None  # read_queue is in-order
+        ary, _ = cl.enqueue_map_buffer(
+            read_queue, host_buf, map_read, 0, state_shape, np.uint32, wait_for=wait_for
+        )
+        return ary
+
+    def launch(slot: int) -> Tuple[List[bytes], List[cl.Event]]:
+        _, _, kernels, areas = buffers[slot]
+        base_salts = []
+        evts = []
+
+        for knl, area in zip(kernels, areas):
+            # Zero this launch's counter on the device; slots past the count
+            # are never read, so they are left as they are. The fill goes
+            # through the launch's own sub-buffer, since touching the parent
+            # while sibling launches run on the out-of-order queue is undefined.
+            fill_evt = cl.enqueue_fill_buffer(
+                queue, area, np.uint32(0), 0, RES_HEAD_WORDS * 4
+            )
+            base_salt = os.urandom(16)
+            # Native-endian uint32 salt words, passed as raw 4-byte views.
+            salt_view = memoryview(base_salt)
+            for i in range(4):
+                knl.set_arg(1 + i, salt_view[4 * i : 4 * i + 4])
+            evts.append(
+                cl.enqueue_nd_range_kernel(
+                    queue, knl, global_shape, local_shape, wait_for=[fill_evt]
+                )
+            )
+            base_salts.append(base_salt)
+        queue.flush()
+        return base_salts, evts
+
+    only_one = ctx.cli.only_one
+    slot = 0
+    base_salts, evts = launch(slot)
+    start = time.perf_counter()
 
     while not ctx.stop_flag:
-        base_salt = os.urandom(16)
-        salt_words = np.frombuffer(base_salt, dtype=np.uint32)
-
-        # reset counter
-        cl.enqueue_fill_buffer(queue, found_count_g, np.uint32(0), 0, 4)
-
-        start = time.time()
-
-        local_shape = None if params.local_size is None else (params.local_size,)
-        kernel(
-            queue,
-            (params.global_threads,),
-            local_shape,
-            np.int32(params.iterations),
-            np.uint32(salt_words[0]),
-            np.uint32(salt_words[1]),
-            np.uint32(salt_words[2]),
-            np.uint32(salt_words[3]),
-            found_count_g,
-            res_g,
-        ).wait()
-
-        cl.enqueue_copy(queue, found_count_host, found_count_g).wait()
-        count = int(found_count_host[0])
-
-        if count > 0:
-            cl.enqueue_copy(queue, res_host, res_g).wait()
-            for slot in range(min(count, RES_SLOTS)):
-                iter_idx = int(res_host[slot * RES_SLOT_WORDS + 0])
-                idx = int(res_host[slot * RES_SLOT_WORDS + 1])
-                variant_idx = int(res_host[slot * RES_SLOT_WORDS + 2])
-                hash0 = int(res_host[slot * RES_SLOT_WORDS + 3] & 0xFF)
-                ok, reason = process_hit(
-                    ctx, base_salt, iter_idx, idx, variant_idx, hash0
+        # Keep the device busy with the next batch while this one is read.
+        next_batch = launch(slot ^ 1)
+        state_g, state_pin, _, _ = buffers[slot]
+
+        # One map covers every counter and result slot of the set; the
+        # blocking map waits on every launch of the set inside the driver.
+        state_host = map_state(state_g, state_pin, evts)
+        with state_host.base:
+            counts = state_host[:, 0].tolist()
+            for k, count in enumerate(counts):
+                # With --only-one, a hit already recorded elsewhere ends the run.
+                if count == 0 or (only_one and ctx.n_found):
+                    continue
+                # --only-one needs a single hit; the rest of the batch is dropped
+                n_hits = 1 if only_one else min(count, RES_SLOTS)
+                hits = state_host[k, RES_HEAD_WORDS:][: n_hits * RES_SLOT_WORDS]
+                ctx.hit_queue.put(
+                    (base_salts[k], hits.reshape(n_hits, RES_SLOT_WORDS).copy())
                 )
-                if not ok:
-                    print(
-                        f"Validation failed: {reason} (iter={iter_idx}, idx={idx}, variant={variant_idx})",
-                        flush=True,
-                    )
-                    ctx.stop_flag = True
-                    raise RuntimeError(f"Validation failed: {reason}")
-                if ctx.cli.only_one and ctx.n_found > 0:
-                    ctx.stop_flag = True
-                    break
-
-        elapsed = time.time() - start
+
+        # Unmaps must complete before this set is reused by the next launch.
+        read_queue.finish()
+        slot ^= 1
+        base_salts, evts = next_batch
+
+        now = time.perf_counter()
+        elapsed = now - start
+        start = now
         crc_factor = cfg.hash0_count if cfg.need_crc else 1
+        batch_threads = params.global_threads * n_launch
         total_batch_iters = (
-            params.global_threads
-            * params.iterations
-            * len(cfg.stateinit_variants)
-            * crc_factor
+            batch_threads * params.iterations * len(cfg.stateinit_variants) * crc_factor
         )
         speed_raw = (
-            params.global_threads * params.iterations / elapsed / 1e6
-            if elapsed > 0
-            else 0.0
+            batch_threads * params.iterations / elapsed / 1e6 if elapsed > 0 else 0.0
         )
         speed_eff = speed_raw * len(cfg.stateinit_variants) * crc_factor
 
-        with ctx.status_lock:
-            ctx.status.speed_raw = speed_raw
-            ctx.status.speed_eff = speed_eff
-            ctx.status.batch_time = elapsed
-            ctx.total_iters += total_batch_iters
-            # misses are now fatal; keep zero
-            ctx.status.found = ctx.n_found
-            ctx.status.threads = params.global_threads
-            ctx.status.iterations = params.iterations * crc_factor
-            ctx.status.local = params.local_size
-            ctx.status.updated = time.time()
+        ctx.device_iters[stats_idx] += total_batch_iters
+        ctx.device_stats[stats_idx] = SearchStats(
+            speed_raw=speed_raw,
+            speed_eff=speed_eff,
+            batch_time=elapsed,
+            found=ctx.n_found,
+            threads=params.global_threads,
+            iterations=params.iterations * crc_factor,
+            local=params.local_size,
+            variants=len(cfg.stateinit_variants),
+            updated=now,
+        )
+
+
+def device_worker(
+    dev: cl.Device,
+    context: cl.Context,
+    program: cl.Program,
+    ctx: SearchContext,
+    stats_idx: int,
+):
+    """Run device_thread and wake main() once the last device has stopped."""
+    try:
+        device_thread(dev, context, program, ctx, stats_idx)
+    finally:
+        with ctx.devices_lock:
+            ctx.devices_running -= 1
+            if ctx.devices_running == 0:
+                ctx.done_event.set()
+
+
+def validator_thread(ctx: SearchContext):
+    """
+    Validate and record the hit batches queued by the device threads, so the
+    host-side SHA-256/base64 work never delays the next kernel launch.
+    """
+    only_one = ctx.cli.only_one
+    try:
+        while True:
+            item = ctx.hit_queue.get()
+            if item is None:
+                return
+            if only_one and ctx.n_found:
+                continue
+            base_salt, hits = item
+            ok, reason, row = process_hits(ctx, base_salt, hits)
+            if not ok:
+                iter_idx, idx, variant_idx, _ = hits[row].tolist()
+                print(
+                    f"Validation failed: {reason} (iter={iter_idx}, idx={idx}, variant={variant_idx})",
+                    flush=True,
+                )
+                raise RuntimeError(f"Validation failed: {reason}")
+            if only_one:
+                ctx.stop_flag = True
+    except BaseException:
+        # Without a validator, hits would pile up in hit_queue unrecorded.
+        ctx.stop_flag = True
+        ctx.done_event.set()
+        raise
+
+
+def writer_thread(ctx: SearchContext):
+    """
+    Append queued hits to addresses.jsonl, draining whatever has piled up into
+    one write + flush so disk latency stays off the device threads.
+    """
+    q = ctx.write_queue
+    done = False
+    while not done:
+        batch = []
+        line = q.get()
+        while line is not None:
+            batch.append(line)
+            if len(batch) >= WRITE_BATCH_MAX:
+                break
+            try:
+                line = q.get_nowait()
+            except Empty:
+                break
+        else:
+            done = True
+        if batch:
+            try:
+                ctx.output_file.write("\n".join(batch) + "\n")
+                ctx.output_file.flush()
+            except BaseException as e:
+                # Unsaved hits must not go on being reported as found.
+                print(f"Failed to write addresses.jsonl: {e}", flush=True)
+                ctx.stop_flag = True
+                ctx.done_event.set()
+                raise
 
 
 def reporter_thread(ctx: SearchContext):
-    history = []  # (timestamp, eff_hps, found_total)
+    history: deque[Tuple[float, float, float]] = deque()  # (ts, eff_hps, found)
+    eff_sum = 0.0  # running sum of history's eff_hps
 
     def fmt_rate(hps: float) -> str:
-        units = [
-            (1e12, "T"),
-            (1e9, "B"),
-            (1e6, "M"),
-            (1e3, "k"),
-        ]
-        for factor, label in units:
-            if hps >= factor:
-                return f"{hps / factor:.2f}{label}"
-        return f"{hps:.2f}"
+        if hps < 1e3:
+            return f"{hps:.2f}"
+        idx = min(len(_RATE_UNITS) - 1, int(math.log10(hps)) // 3)
+        if hps < 1000.0**idx:  # log10 rounded up just below a power of 1000
+            idx -= 1
+        return f"{hps / 1000.0**idx:.2f}{_RATE_UNITS[idx]}"
+
+    def fmt_duration(sec: float) -> str:
+        if sec >= 3600:
+            h = int(sec // 3600)
+            m = int((sec % 3600) // 60)
+            return f"{h}h{m:02d}m"
+        if sec >= 60:
+            m = int(sec // 60)
+            s = int(sec % 60)
+            return f"{m}m{s:02d}s"
+        return f"{sec:.1f}s"
 
     def add_history(ts: float, eff: float, found: float):
+        nonlocal eff_sum
         history.append((ts, eff, found))
+        eff_sum += eff
         cutoff = ts - 20.0
         while history and history[0][0] < cutoff:
-            history.pop(0)
+            eff_sum -= history.popleft()[1]
 
     def avg_rates():
         if not history:
             return 0.0, 0.0
-        eff_avg = sum(h[1] for h in history) / len(history)
+        eff_avg = eff_sum / len(history)
         # derivative of found over window
         if len(history) >= 2:
             f0 = history[0][2]
@@ -1219,42 +1646,32 @@ def reporter_thread(ctx: SearchContext):
             found_rate = 0.0
         return eff_avg, found_rate
 
+    hit_prob = ctx.hit_prob
+    start_time = ctx.start_time
+
     while not ctx.stop_flag:
-        with ctx.status_lock:
-            snap = SearchStats(**ctx.status.__dict__)
-            total_iters = ctx.total_iters
-            hit_prob = ctx.hit_prob
-            start_time = ctx.start_time
+        # Aggregate the per-device slots; each is a complete SearchStats.
+        stats = list(ctx.device_stats)
+        speed_eff = sum(st.speed_eff for st in stats)
+        updated = max(st.updated for st in stats)
+        # Found count as of the latest publish, so it stays paired with `updated`.
+        found = max(st.found for st in stats)
+        total_iters = sum(ctx.device_iters)
         if total_iters <= 0:
             time.sleep(PRINT_INTERVAL)
             continue
 
-        eff = snap.speed_eff * 1e6  # h/s
-        add_history(snap.updated, eff, snap.found)
+        eff = speed_eff * 1e6  # h/s
+        add_history(updated, eff, found)
         eff_avg, found_rate_10s = avg_rates()
 
-        green = "\x1b[32m"
-        cyan = "\x1b[36m"
-        dim = "\x1b[2m"
-        reset = "\x1b[0m"
         fr_part = f" ({found_rate_10s:,.2f}/s)" if found_rate_10s > 1 else ""
-        found_color = green if snap.found > 0 else "\x1b[37m"
+        found_color = _ANSI_GREEN if found > 0 else _ANSI_WHITE
         eta_part = ""
 
-        def fmt_duration(sec: float) -> str:
-            if sec >= 3600:
-                h = int(sec // 3600)
-                m = int((sec % 3600) // 60)
-                return f"{h}h{m:02d}m"
-            if sec >= 60:
-                m = int(sec // 60)
-                s = int(sec % 60)
-                return f"{m}m{s:02d}s"
-            return f"{sec:.1f}s"
-
         if (
-            snap.found == 0
-            and (time.time() - start_time) >= 1.0
+            found == 0
+            and (time.perf_counter() - start_time) >= 1.0
             and eff_avg > 0
             and hit_prob > 0
         ):
@@ -1265,8 +1682,8 @@ def reporter_thread(ctx: SearchContext):
                 eta_part = f", ETA {fmt_duration(eta_seconds)}"
 
         msg = (
-            f"{found_color}Found {snap.found:,}{reset}{fr_part}, "
-            f"{dim}{cyan}{fmt_rate(eff_avg)} iters/s{reset}{eta_part}"
+            f"{found_color}Found {found:,}{_ANSI_RESET}{fr_part}, "
+            f"{_ANSI_DIM_CYAN}{fmt_rate(eff_avg)} iters/s{_ANSI_RESET}{eta_part}"
         )
         print(msg, flush=True)
         time.sleep(PRINT_INTERVAL)
@@ -1332,6 +1749,16 @@ def parse_cli() -> CliConfig:
         default=None,
         help="Comma-separated OpenCL device ids to use (see device list printed on startup)",
     )
+    parser.add_argument(
+        "--all-devices",
+        action="store_true",
+        help="Use every OpenCL device instead of the GPUs of the fastest platform",
+    )
+    parser.add_argument(
+        "--tune",
+        action="store_true",
+        help="Benchmark launch sizes on each device and cache the fastest for later runs",
+    )
 
     if len(sys.argv) == 1:
         parser.print_help()
@@ -1382,6 +1809,8 @@ def parse_cli() -> CliConfig:
         case_sensitive=bool(args.case_sensitive),
         only_one=bool(args.only_one),
         device_ids=device_ids,
+        all_devices=bool(args.all_devices),
+        tune=bool(args.tune),
     )
 
 
@@ -1408,7 +1837,7 @@ def main():
 
     if len(all_devices) > 1:
         print(
-            "Multiple OpenCL devices detected. Use --devices <id>[,<id>...] to select specific ones."
+            "Multiple OpenCL devices detected. Use --devices <id>[,<id>...] to select specific ones, or --all-devices to use all of them."
         )
         print("Available devices:")
         for idx, platform, dev in all_devices:
@@ -1422,8 +1851,13 @@ def main():
         if missing:
             die(f"--devices ids not found: {', '.join(str(m) for m in missing)}")
 
+    if selected_indices is None and not cli.all_devices:
+        candidates = pick_default_devices(all_devices)
+    else:
+        candidates = all_devices
+
     selected_devices: List[Tuple[cl.Platform, cl.Device, int]] = []
-    for idx, platform, dev in all_devices:
+    for idx, platform, dev in candidates:
         if selected_indices is None or idx in selected_indices:
             selected_devices.append((platform, dev, idx))
 
@@ -1431,40 +1865,68 @@ def main():
     for platform, dev, idx in selected_devices:
         platform_map.setdefault(platform, []).append((dev, idx))
 
-    def attach_devices(platform: cl.Platform, devices: List[Tuple[cl.Device, int]]):
+    def build_program(
+        devices: List[Tuple[cl.Device, int]],
+    ) -> Tuple[cl.Context, cl.Program]:
+        """
+        One context and one program build shared by every selected device of a
+        platform; each device thread still creates its own queues.
+        """
+        cl_devices = [d for d, _ in devices]
+        context = cl.Context(devices=cl_devices)
+        return context, cl.Program(context, kernel_src).build(devices=cl_devices)
+
+    def attach_devices(
+        devices: List[Tuple[cl.Device, int]],
+        context: cl.Context,
+        program: cl.Program,
+    ):
         nonlocal devices_used, threads
-        if not devices:
-            return
-        context = cl.Context(devices=[d for d, _ in devices])
-        program = cl.Program(context, kernel_src).build()
         for dev, idx in devices:
             print(f"Using device: [{idx}] {dev.name}")
+            stats_idx = len(ctx.device_stats)
+            ctx.device_stats.append(
+                SearchStats(variants=len(kernel_cfg.stateinit_variants))
+            )
+            ctx.device_iters.append(0.0)
+            with ctx.devices_lock:
+                ctx.devices_running += 1
             t = Thread(
-                target=device_thread,
-                args=(dev, context, program, ctx),
+                target=device_worker,
+                args=(dev, context, program, ctx, stats_idx),
                 name=f"dev-{dev.name}",
             )
             t.start()
             threads.append(t)
             devices_used.append(dev)
 
-    for platform in platforms:
-        attach_devices(platform, platform_map.get(platform, []))
+    # Program builds can take seconds per platform; run them concurrently and
+    # attach devices in platform order once all are built.
+    platform_devices = [platform_map[p] for p in platforms if platform_map.get(p)]
+    if platform_devices:
+        with ThreadPoolExecutor(max_workers=len(platform_devices)) as pool:
+            builds = list(pool.map(build_program, platform_devices))
+        for devices, (context, program) in zip(platform_devices, builds):
+            attach_devices(devices, context, program)
 
     if not devices_used:
         die("No OpenCL devices matched the selection")
 
     reporter = Thread(target=reporter_thread, args=(ctx,), name="reporter", daemon=True)
     reporter.start()
+    validator = Thread(
+        target=validator_thread, args=(ctx,), name="validator", daemon=True
+    )
+    validator.start()
+    writer = Thread(target=writer_thread, args=(ctx,), name="writer", daemon=True)
+    writer.start()
 
     try:
-        while not ctx.stop_flag:
-            alive = False
-            for t in threads:
-                t.join(1)
-                alive = alive or t.is_alive()
-            if not alive:
-                break
+        # Device threads exit on stop_flag (set by --only-one or a failed
+        # validation) or on error; the last one to go sets done_event. The
+        # wait is bounded because an untimed one ignores Ctrl-C on Windows.
+        while not ctx.done_event.wait(0.5):
+            pass
     except KeyboardInterrupt:
         print("Interrupted")
         ctx.stop_flag = True
@@ -1473,6 +1935,10 @@ def main():
         for t in threads:
             t.join()
         reporter.join()
+        ctx.hit_queue.put(None)
+        validator.join()
+        ctx.write_queue.put(None)
+        writer.join()
         ctx.output_file.close()
 
 
@@ -250,24 +250,21 @@ __constant uint CODE_STATE_BASE[8] = { <<CODE_STATE_BASE>> };
 #define N_STATEINIT_VARIANTS <<N_STATEINIT_VARIANTS>>
 #define STATEINIT_PREFIX_MAX_LEN <<STATEINIT_PREFIX_MAX_LEN>>
 #define N_ACTIVE <<N_ACTIVE>>
-#define N_ACTIVE_NOCRC <<N_ACTIVE_NOCRC>>
 #define N_CASE_CONST <<N_CASE_CONST>>
 #define N_CASE_VAR <<N_CASE_VAR>>
-
-// Byte-level masks for prefix matching (36 bytes)
-__constant uchar PREFIX_MASK[36] = { <<PREFIX_MASK>> };
-__constant uchar PREFIX_VAL[36]  = { <<PREFIX_VAL>> };
+// Masks/values for the CRC bytes (repr[34], repr[35]); 0 mask drops the check.
+#define CRC_HI_MASK <<CRC_HI_MASK>>
+#define CRC_HI_VAL  <<CRC_HI_VAL>>
+#define CRC_LO_MASK <<CRC_LO_MASK>>
+#define CRC_LO_VAL  <<CRC_LO_VAL>>
+// Per-launch state layout: hit counter header, then RES_SLOTS result slots.
+#define RES_HEAD_WORDS <<RES_HEAD_WORDS>>
+#define RES_SLOTS <<RES_SLOTS>>
 
 // Allowed values for the first hash byte (repr[2]) given fixedPrefixLength=8
 // and any forced bits coming from the start pattern.
 __constant uchar HASH0_VALUES[256] = { <<HASH0_VALUES>> };
 
-#if N_CASE_CONST > 0
-__constant ushort CASE_CONST_BITPOS[N_CASE_CONST] = { <<CASE_CONST_BITPOS>> };
-__constant uchar  CASE_CONST_ALT0[N_CASE_CONST] = { <<CASE_CONST_ALT0>> };
-__constant uchar  CASE_CONST_ALT1[N_CASE_CONST] = { <<CASE_CONST_ALT1>> };
-#endif
-
 #if N_CASE_VAR > 0
 __constant ushort CASE_VAR_BITPOS[N_CASE_VAR] = { <<CASE_VAR_BITPOS>> };
 __constant uchar  CASE_VAR_ALT0[N_CASE_VAR] = { <<CASE_VAR_ALT0>> };
@@ -285,9 +282,6 @@ __constant uchar STATEINIT_PREFIX_LENS[N_STATEINIT_VARIANTS] = { <<STATEINIT_PRE
 #if N_ACTIVE > 0
 __constant uchar PREFIX_POS[N_ACTIVE] = { <<PREFIX_POS>> };
 #endif
-#if N_ACTIVE_NOCRC > 0
-__constant uchar PREFIX_POS_NOCRC[N_ACTIVE_NOCRC] = { <<PREFIX_POS_NOCRC>> };
-#endif
 
 // prepacked prefix contribution to message block words (Assumed zero-padded by host)
 __constant uint PREFIX_W[N_STATEINIT_VARIANTS][16] = {
@@ -314,16 +308,29 @@ inline uchar repr_byte(const int i, const uchar hash0, const uint *main_hash, co
     return (uchar)(crc & 0xffu);
 }
 
+// 6-bit base64 digit starting at address bit `bit` (spans at most 2 bytes).
+inline uchar repr_digit(const int bit, const uchar hash0, const uint *main_hash, const ushort crc)
+{
+    const int byte_idx = bit >> 3;
+    ushort comb = (ushort)repr_byte(byte_idx, hash0, main_hash, crc) << 8;
+    if (byte_idx + 1 < 36) {
+        comb |= (ushort)repr_byte(byte_idx + 1, hash0, main_hash, crc);
+    }
+    return (uchar)((comb >> (10 - (bit & 7))) & 0x3fu);
+}
+
 __kernel void hash_main(
     int iterations,
     uint salt0,
     uint salt1,
     uint salt2,
     uint salt3,
-    volatile __global uint *found_counter,
-    __global unsigned int * restrict res
+    __global uint *state
 )
 {
+    // Hit counter in word 0, result slots after the RES_HEAD_WORDS header.
+    volatile __global uint *found_counter = state;
+    __global uint *res = state + RES_HEAD_WORDS;
     uint idx = get_global_id(0);
 
     // Allocate private memory (registers)
@@ -421,58 +428,15 @@ __kernel void hash_main(
             sha256_process2(W, main_hash);
 
             // --- Constraint Checking ---
-            int ok = 1;
-
             // Early check on non-CRC constrained bytes. This must not depend on
             // the first hash byte, which is swept later via HASH0_VALUES.
-#if N_ACTIVE_NOCRC > 0
-            if (ok) {
-                #pragma unroll
-                for (int j = 0; j < N_ACTIVE_NOCRC; j++) {
-                    int i = PREFIX_POS_NOCRC[j];
-                    // Host guarantees PREFIX_POS_NOCRC contains only bytes 3..33.
-                    uchar val = GET_BYTE_BE_ARRAY(main_hash, i - 2);
-
-                    if ((val & PREFIX_MASK[i]) != PREFIX_VAL[i]) {
-                        ok = 0;
-                        break;
-                    }
-                }
-            }
-#endif
-
-            if (!ok) {
-                continue;
-            }
-
-            // Case-insensitivity constraints that do not depend on hash0 or CRC.
-#if N_CASE_CONST > 0
-            if (ok) {
-                #pragma unroll
-                for (int j = 0; j < N_CASE_CONST; j++) {
-                    ushort bit = CASE_CONST_BITPOS[j];
-                    int byte_idx = (int)(bit >> 3);
-                    int bit_in_byte = 7 - (int)(bit & 7);
-
-                    uchar byte0 = repr_byte(byte_idx, (uchar)0, main_hash, (ushort)0);
-                    uchar byte1 = (byte_idx + 1 < 36)
-                        ? repr_byte(byte_idx + 1, (uchar)0, main_hash, (ushort)0)
-                        : 0;
-
-                    ushort comb = ((ushort)byte0 << 8) | (ushort)byte1;
-                    uchar val6 = (uchar)((comb >> (bit_in_byte + 3)) & 0x3fu);
-
-                    if ((val6 != CASE_CONST_ALT0[j]) && (val6 != CASE_CONST_ALT1[j])) {
-                        ok = 0;
-                        break;
-                    }
-                }
-            }
-#endif
+            // Generated by the host as one straight-line test per byte of
+            // PREFIX_POS_NOCRC (bytes 3..33 only), with immediate mask/value.
+            <<PREFIX_CHECK_INLINE>>
 
-            if (!ok) {
-                continue;
-            }
+            // Case-insensitivity constraints that do not depend on hash0 or CRC,
+            // generated the same way from the CASE_CONST_* digits.
+            <<CASE_CONST_CHECK_INLINE>>
 
             // Fast path: no CRC needed at all (no constraints on CRC bytes and
             // no case-insensitive digits touching them). Keep legacy behavior:
@@ -510,7 +474,7 @@ __kernel void hash_main(
 
                 if (ok_local) {
                     uint slot = atomic_inc(found_counter);
-                    if (slot < 1024u) {
+                    if (slot < RES_SLOTS) {
                         res[slot * 4]     = (uint)iter;
                         res[slot * 4 + 1] = idx;
                         res[slot * 4 + 2] = (uint)v;
@@ -539,13 +503,18 @@ __kernel void hash_main(
 
                 int ok_local = 1;
 
-                // CRC-dependent byte-mask constraints: only bytes 34 and 35.
-                if (PREFIX_MASK[34] && ((crc_hi & PREFIX_MASK[34]) != PREFIX_VAL[34])) {
+                // CRC-dependent byte-mask constraints: only bytes 34 and 35,
+                // compiled in only for the bytes the pattern constrains.
+        #if CRC_HI_MASK
+                if ((crc_hi & CRC_HI_MASK) != CRC_HI_VAL) {
                     ok_local = 0;
                 }
-                if (ok_local && PREFIX_MASK[35] && ((crc_lo & PREFIX_MASK[35]) != PREFIX_VAL[35])) {
+        #endif
+        #if CRC_LO_MASK
+                if (ok_local && ((crc_lo & CRC_LO_MASK) != CRC_LO_VAL)) {
                     ok_local = 0;
                 }
+        #endif
 
         #if N_CASE_VAR > 0
                 if (ok_local) {
@@ -573,7 +542,7 @@ __kernel void hash_main(
 
                 if (ok_local) {
                     uint slot = atomic_inc(found_counter);
-                    if (slot < 1024u) {
+                    if (slot < RES_SLOTS) {
                         res[slot * 4]     = (uint)iter;
                         res[slot * 4 + 1] = idx;
                         res[slot * 4 + 2] = (uint)v;